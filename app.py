@@ -1,5 +1,3 @@
-import pandas as pd
-import plotly.express as px
 import streamlit as st
 from datetime import datetime, timezone, timedelta
 import streamlit_authenticator as stauth
@@ -7,13 +5,16 @@ import os
 import yaml
 from yaml.loader import SafeLoader
 import logging
-from src.processing import load_and_process_data
+from src.metrics import record_first_page, start_metrics_server, timed_section
 
 
 # Configuração básica de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Servidor de métricas (Prometheus e perfil JSON), iniciado uma única vez por processo
+start_metrics_server()
+
 # --- Configurações da Página e Timestamp ---
 # Configuração inicial do Streamlit
 st.set_page_config(
@@ -56,68 +57,78 @@ if st.session_state.get('authentication_status'):
     authenticator.logout(button_name='Logout', location='sidebar')
     st.sidebar.title(f"Bem-vindo(a) *{st.session_state.get('name')}*")
     
-    @st.cache_data
-    def get_data():
-        """Função com cache para carregar e processar os dados uma única vez."""
-        return load_and_process_data("data/dadosregiao.csv") # Caminho correto para os dados
-
-    df = get_data()
+    # Importações pesadas só depois do login; em produção já foram carregadas pelo pré-aquecimento (src/prewarm.py)
+    import plotly.express as px
+    from src.reload import get_shared_manager
+    from src.spatial import MAP_LEVELS
+    from src.table import PAGE_SIZES
+
+    # Cada execução usa uma única versão dos dados, mesmo que uma nova seja publicada durante a renderização
+    dados = get_shared_manager().current
+    cube = dados.cube
+    filter_index = dados.filter_index
+    spatial_index = dados.spatial_index
+    table_view = dados.table_view
 
     # --- Barra Lateral (Filtros) ---
     st.sidebar.header("🔍 Filtros")
 
     # Filtro por Região
-    regioes_disponiveis = sorted(df['REGIAO'].dropna().unique())
+    regioes_disponiveis = cube.options('REGIAO')
     regioes_selecionadas = st.sidebar.multiselect("Região", regioes_disponiveis, default=regioes_disponiveis)
 
     # Filtro por Região da Cidade
-    regioes_cidade_disponiveis = sorted(df['REGIAO_CIDADE'].dropna().unique())
+    regioes_cidade_disponiveis = cube.options('REGIAO_CIDADE')
     regioes_cidade_selecionadas = st.sidebar.multiselect("Localização", regioes_cidade_disponiveis, default=regioes_cidade_disponiveis)
 
     # Filtro por Estado
-    estados_disponiveis = sorted(df['ESTADO'].unique())
+    estados_disponiveis = cube.options('ESTADO')
     estados_selecionados = st.sidebar.multiselect("Estado", estados_disponiveis, default=estados_disponiveis)
 
     # Filtro por Gênero
-    generos_disponiveis = sorted(df['SEXO'].unique())
+    generos_disponiveis = cube.options('SEXO')
     generos_selecionados = st.sidebar.multiselect("Gênero", generos_disponiveis, default=generos_disponiveis)
 
     # Filtro por Status
-    status_disponiveis = sorted(df['Status'].unique())
+    status_disponiveis = cube.options('Status')
     status_selecionados = st.sidebar.multiselect("Status", status_disponiveis, default=status_disponiveis)
 
     # Filtro por Plano
-    planos_disponiveis = sorted(df['PLANO'].unique())
+    planos_disponiveis = cube.options('PLANO')
     planos_selecionados = st.sidebar.multiselect("Plano", planos_disponiveis, default=planos_disponiveis)
 
     # Filtro por Tipo de Cargo
-    tipos_cargo_disponiveis = sorted(df['TIPO_CARGO'].unique())
+    tipos_cargo_disponiveis = cube.options('TIPO_CARGO')
     tipos_cargo_selecionados = st.sidebar.multiselect("Tipo de Cargo", tipos_cargo_disponiveis, default=tipos_cargo_disponiveis)
 
     # Filtro por Faixa Etária
     # Tratamento robusto para o caso de não haver idades válidas
-    if not df['IDADE'].dropna().empty:
-        idade_min = int(df['IDADE'].dropna().min())
-        idade_max = int(df['IDADE'].dropna().max())
+    idades_disponiveis = cube.options('IDADE')
+    if idades_disponiveis:
+        idade_min = int(idades_disponiveis[0])
+        idade_max = int(idades_disponiveis[-1])
         faixa_etaria = st.sidebar.slider("Faixa Etária", idade_min, idade_max, (idade_min, idade_max))
     else:
         st.sidebar.warning("Nenhuma idade válida para filtrar.")
         faixa_etaria = (0, 100) # Define um padrão para evitar erro
 
-    # --- Filtragem do DataFrame ---
-    df_filtrado = df[
-        (df['REGIAO'].isin(regioes_selecionadas)) &
-        (df['REGIAO_CIDADE'].isin(regioes_cidade_selecionadas)) &
-        (df['ESTADO'].isin(estados_selecionados)) &
-        (df['SEXO'].isin(generos_selecionados)) &
-        (df['Status'].isin(status_selecionados)) &
-        (df['PLANO'].isin(planos_selecionados)) &
-        (df['TIPO_CARGO'].isin(tipos_cargo_selecionados)) &
-        # Filtragem robusta de idade, ignorando valores nulos para evitar erros
-        (df['IDADE'].notna() &
-         (df['IDADE'] >= faixa_etaria[0]) &
-         (df['IDADE'] <= faixa_etaria[1]))
-    ]
+    # --- Filtragem do cubo (KPIs e gráficos) ---
+    selecoes = {
+        'REGIAO': regioes_selecionadas,
+        'REGIAO_CIDADE': regioes_cidade_selecionadas,
+        'ESTADO': estados_selecionados,
+        'SEXO': generos_selecionados,
+        'Status': status_selecionados,
+        'PLANO': planos_selecionados,
+        'TIPO_CARGO': tipos_cargo_selecionados,
+    }
+    with timed_section("filtros"):
+        celulas = cube.mask(selecoes, faixa_etaria)
+
+        # --- Filtragem do DataFrame (mapa e tabela) ---
+        # Idades nulas são sempre excluídas pelo filtro de faixa etária
+        linhas_filtradas = filter_index.resolve(selecoes, faixa_etaria)
+    estado_filtros = (tuple((coluna, frozenset(valores)) for coluna, valores in selecoes.items()), tuple(faixa_etaria))
 
     # --- Conteúdo Principal ---
     st.title("📊 Dashboard de Análise de Colaboradores")
@@ -126,12 +137,8 @@ if st.session_state.get('authentication_status'):
     # --- Métricas Principais (KPIs) ---
     st.subheader("Métricas Gerais")
 
-    if not df_filtrado.empty:
-        total_colaboradores = df_filtrado.shape[0]
-        idade_media = int(df_filtrado['IDADE'].mean())
-    else:
-        total_colaboradores = 0
-        idade_media = 0
+    total_colaboradores = cube.total(celulas)
+    idade_media = int(cube.mean_age(celulas)) if total_colaboradores > 0 else 0
 
     col1, col2 = st.columns(2)
     col1.metric("Total de Colaboradores", f"{total_colaboradores:,}")
@@ -143,71 +150,108 @@ if st.session_state.get('authentication_status'):
     def display_chart(chart_function, data, title, **kwargs):
         """Função auxiliar para exibir um gráfico ou um aviso se não houver dados."""
         st.subheader(title)
-        if not data.empty:
-            fig = chart_function(data, **kwargs)
-            # Aplica configurações específicas para gráficos de pizza
-            if 'hole' in kwargs:
-                fig.update_traces(textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning(f"Nenhum dado para exibir no gráfico: {title}")
+        with timed_section(title):
+            if not data.empty:
+                fig = chart_function(data, **kwargs)
+                # Aplica configurações específicas para gráficos de pizza
+                if 'hole' in kwargs:
+                    fig.update_traces(textinfo='percent+label')
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.warning(f"Nenhum dado para exibir no gráfico: {title}")
 
     # --- Análises Visuais com Plotly ---
     col_graf1, col_graf2 = st.columns(2)
 
     with col_graf1:
-        dist_regiao = df_filtrado['REGIAO'].value_counts().reset_index(name='Quantidade')
+        dist_regiao = cube.distribution('REGIAO', celulas)
         display_chart(px.bar, dist_regiao, title="Distribuição por Região", x='REGIAO', y='Quantidade')
 
     with col_graf2:
-        display_chart(px.histogram, df_filtrado, title="Faixa Etária dos Colaboradores", x='IDADE', nbins=20)
+        dist_idade = cube.distribution('IDADE', celulas)
+        display_chart(px.histogram, dist_idade, title="Faixa Etária dos Colaboradores", x='IDADE', y='Quantidade', histfunc='sum', nbins=20)
 
     col_graf3, col_graf4, col_graf5 = st.columns(3)
 
     with col_graf3:
-        dist_genero = df_filtrado['SEXO'].value_counts().reset_index(name='Quantidade')
+        dist_genero = cube.distribution('SEXO', celulas)
         display_chart(px.pie, dist_genero, title="Distribuição de Gênero", names='SEXO', values='Quantidade', hole=0.5)
 
     with col_graf4:
-        dist_status = df_filtrado['Status'].value_counts().reset_index(name='Quantidade')
+        dist_status = cube.distribution('Status', celulas)
         display_chart(px.pie, dist_status, title="Status dos Colaboradores", names='Status', values='Quantidade', hole=0.5)
 
     with col_graf5:
-        dist_plano = df_filtrado['PLANO'].value_counts().reset_index(name='Quantidade')
+        dist_plano = cube.distribution('PLANO', celulas)
         display_chart(px.pie, dist_plano, title="Colaboradores por Plano", names='PLANO', values='Quantidade', hole=0.5)
 
     # --- Mapa de Calor do Brasil ---
     st.subheader("Distribuição de Colaboradores por Cidade")
-    try:
-        if not df_filtrado.empty:
-            fig_mapa = px.density_mapbox(
-                df_filtrado,
-                lat="latitude",
-                lon="longitude",
-                radius=10,
-                zoom=3,
-                height=600,
-                mapbox_style="carto-positron",  # Estilo que não requer token
-                title="Distribuição de Colaboradores por Cidade"
-            )
-            fig_mapa.update_layout(
-                mapbox=dict(
-                    center=dict(lat=-15.7801, lon=-47.9292),  # Centro do Brasil
+    nivel_mapa = st.radio("Nível de detalhe do mapa", list(MAP_LEVELS), horizontal=True)
+    with timed_section("mapa"):
+        try:
+            # O mapa recebe uma linha por célula da grade, com a contagem como peso
+            celulas_mapa = spatial_index.aggregate(linhas_filtradas, nivel_mapa, cache_key=estado_filtros)
+            if not celulas_mapa.empty:
+                fig_mapa = px.density_mapbox(
+                    celulas_mapa,
+                    lat="latitude",
+                    lon="longitude",
+                    z="Quantidade",
+                    radius=10,
+                    zoom=MAP_LEVELS[nivel_mapa]['zoom'],
+                    height=600,
+                    mapbox_style="carto-positron",  # Estilo que não requer token
+                    title="Distribuição de Colaboradores por Cidade"
                 )
-            )
-            st.plotly_chart(fig_mapa, use_container_width=True)
-        else:
-            st.warning("Nenhum dado para exibir no mapa.")
-    except Exception as e:
-        st.error(f"Ocorreu um erro ao gerar o mapa de calor. A equipe de desenvolvimento já foi notificada.")
-        logger.error(f"Erro no mapa de calor: {e}")
+                fig_mapa.update_layout(
+                    mapbox=dict(
+                        center=dict(lat=-15.7801, lon=-47.9292),  # Centro do Brasil
+                    )
+                )
+                st.plotly_chart(fig_mapa, use_container_width=True)
+            else:
+                st.warning("Nenhum dado para exibir no mapa.")
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao gerar o mapa de calor. A equipe de desenvolvimento já foi notificada.")
+            logger.error(f"Erro no mapa de calor: {e}")
 
     # --- Tabela de Dados Detalhados ---
     st.subheader("Dados Detalhados")
-    if not df_filtrado.empty:
-        st.dataframe(df_filtrado)
-    else:
-        st.warning("Nenhum dado para exibir com os filtros selecionados.")
+    col_busca, col_ordem, col_sentido, col_tamanho = st.columns([3, 2, 1, 1])
+    busca = col_busca.text_input("Buscar", placeholder="Chapa, função, unidade, bairro ou cidade")
+    coluna_ordem = col_ordem.selectbox("Ordenar por", ["(ordem original)"] + table_view.columns)
+    crescente = col_sentido.radio("Sentido", ["Crescente", "Decrescente"]) == "Crescente"
+    tamanho_pagina = col_tamanho.selectbox("Linhas por página", PAGE_SIZES)
+
+    with timed_section("tabela"):
+        # Apenas posições são calculadas; somente a página visível é materializada
+        posicoes = table_view.select(
+            linhas_filtradas,
+            sort_by=None if coluna_ordem == "(ordem original)" else coluna_ordem,
+            ascending=crescente,
+            search=busca,
+        )
+        if len(posicoes) > 0:
+            total_paginas = (len(posicoes) - 1) // tamanho_pagina + 1
+            pagina = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, value=1)
+            st.dataframe(table_view.page(posicoes, pagina, tamanho_pagina), use_container_width=True)
+            inicio = (pagina - 1) * tamanho_pagina + 1
+            st.caption(f"Exibindo {inicio:,}–{min(inicio + tamanho_pagina - 1, len(posicoes)):,} de {len(posicoes):,} registros")
+
+            # O CSV completo só é gerado quando o usuário clica (download adiado do Streamlit); até lá,
+            # cada execução guarda apenas a função. Na geração, o arquivo inteiro fica em memória até ser enviado.
+            st.download_button(
+                "Baixar CSV",
+                data=lambda posicoes=posicoes: b"".join(table_view.iter_csv_chunks(posicoes)),
+                file_name="dados_detalhados.csv",
+                mime="text/csv",
+            )
+        else:
+            st.warning("Nenhum dado para exibir com os filtros selecionados.")
+
+    # Tempo do início do processo até a primeira página completa (registrado uma única vez)
+    record_first_page()
 
 # Mensagens de erro/aviso para o processo de login
 elif st.session_state.get("authentication_status") is False:
@@ -0,0 +1,83 @@
+"""
+Benchmark de equivalência e desempenho dos classificadores vetorizados.
+Compara _classify_special_locations e _classify_job_type com as versões
+linha a linha originais em um conjunto sintético.
+
+Uso: python -m benchmarks.bench_classification [n_linhas]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.constants import BAIRROS_RIO, CARGOS_GERENCIAIS, OUTRAS_LOCALIDADES
+from src.processing import _classify_job_type, _classify_special_locations
+
+
+def _reference_special_locations(df: pd.DataFrame) -> pd.Series:
+    """Implementação original (apply por linha), usada como referência."""
+    def classificar(row):
+        bairro = str(row['BAIRRO']).upper().strip()
+        if row['CIDADE'] == 'Rio de Janeiro':
+            for regiao, bairros_na_regiao in BAIRROS_RIO.items():
+                if bairro in bairros_na_regiao:
+                    return regiao
+            return 'Rio_Outra'
+        return OUTRAS_LOCALIDADES.get(bairro, row['CIDADE'])
+
+    return df.apply(classificar, axis=1)
+
+
+def _reference_job_type(df: pd.DataFrame) -> pd.Series:
+    """Implementação original (lambda por linha), usada como referência."""
+    return df['FUNÇÃO'].apply(
+        lambda x: 'Gerencial' if any(cargo in str(x).upper() for cargo in CARGOS_GERENCIAIS) else 'Operacional'
+    )
+
+
+def make_synthetic(n: int, seed: int = 0) -> pd.DataFrame:
+    """Gera um DataFrame sintético com as colunas usadas pelos classificadores."""
+    rng = np.random.default_rng(seed)
+    bairros = [b for bairros in BAIRROS_RIO.values() for b in sorted(bairros)]
+    bairros += list(OUTRAS_LOCALIDADES) + ['centro ', ' Tijuca', 'JARDIM NOVO', 'VILA NOVA']
+    cidades = ['Rio de Janeiro', 'Nova Iguaçu', 'São Paulo', 'Belo Horizonte', 'Niterói']
+    funcoes = ['AUXILIAR DE COZINHA', 'Gerente de Loja', 'DIRETOR FINANCEIRO', 'ATENDENTE',
+               'SUPERVISOR DE SALAO', 'COZINHEIRO', 'CHEF EXECUTIVO DE COZINHA', 'CONTROLLER', 'GARCOM']
+
+    bairro = pd.Series(rng.choice(bairros, n), dtype=object)
+    bairro[rng.random(n) < 0.01] = np.nan
+    funcao = pd.Series(rng.choice(funcoes, n), dtype=object)
+    funcao[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({
+        'BAIRRO': bairro,
+        'CIDADE': rng.choice(cidades, n, p=[0.5, 0.1, 0.2, 0.1, 0.1]),
+        'FUNÇÃO': funcao.astype('category'),
+    })
+
+
+def _timed(func, *args):
+    inicio = time.perf_counter()
+    resultado = func(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main(n: int = 1_000_000) -> None:
+    df = make_synthetic(n)
+    print(f"Conjunto sintético: {n:,} linhas")
+
+    casos = [
+        ('_classify_special_locations', _reference_special_locations, _classify_special_locations, 'REGIAO_CIDADE'),
+        ('_classify_job_type', _reference_job_type, _classify_job_type, 'TIPO_CARGO'),
+    ]
+    for nome, referencia, vetorizada, coluna in casos:
+        esperado, t_ref = _timed(referencia, df)
+        obtido, t_vec = _timed(vetorizada, df.copy())
+        pd.testing.assert_series_equal(
+            obtido[coluna].astype(object), esperado.astype(object), check_names=False
+        )
+        print(f"{nome}: linha a linha {t_ref:.2f}s | vetorizado {t_vec:.3f}s | {t_ref / t_vec:.0f}x (resultados idênticos)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
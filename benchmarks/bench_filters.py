@@ -0,0 +1,75 @@
+"""
+Micro-benchmarks do índice de bitmaps dos filtros contra a cadeia de máscaras `isin`
+usada originalmente pelo dashboard.
+
+Uso: python -m benchmarks.bench_filters [n_linhas]
+"""
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from src.constants import MAPA_REGIOES
+from src.filters import BitmapFilterIndex
+
+
+def make_processed_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """Gera um DataFrame sintético com as colunas de filtro do DataFrame processado."""
+    rng = np.random.default_rng(seed)
+    estados = np.array(sorted(MAPA_REGIOES))
+    estado = rng.choice(estados, n)
+    localizacoes = [f"Cidade {i:03d}" for i in range(200)] + ['Rio_Zona Sul', 'Rio_Centro', 'Rio_Zona Norte', 'Rio_Zona Oeste', 'Rio_Outra']
+    idade = pd.array(rng.integers(18, 70, n), dtype='Int64')
+    idade[rng.random(n) < 0.005] = pd.NA
+    return pd.DataFrame({
+        'REGIAO': pd.Series(estado).map(MAPA_REGIOES),
+        'REGIAO_CIDADE': rng.choice(localizacoes, n),
+        'ESTADO': pd.Categorical(estado),
+        'SEXO': pd.Categorical(rng.choice(['F', 'M'], n)),
+        'Status': pd.Categorical(rng.choice(['Ativo', 'Afastado', 'Férias'], n, p=[0.85, 0.05, 0.10])),
+        'PLANO': pd.Categorical(rng.choice(['Plano A', 'Plano B', 'Sem plano'], n)),
+        'TIPO_CARGO': rng.choice(['Gerencial', 'Operacional'], n, p=[0.1, 0.9]),
+        'IDADE': idade,
+    })
+
+
+def isin_mask(df: pd.DataFrame, selections: dict, age_range: tuple) -> np.ndarray:
+    """Cadeia de máscaras original do dashboard."""
+    mask = df['IDADE'].notna() & (df['IDADE'] >= age_range[0]) & (df['IDADE'] <= age_range[1])
+    for column, selected in selections.items():
+        mask &= df[column].isin(selected)
+    return mask.to_numpy(dtype=bool)
+
+
+def _best(func, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(n: int = 1_000_000) -> None:
+    df = make_processed_frame(n)
+    print(f"Conjunto sintético: {n:,} linhas")
+
+    build = _best(lambda: BitmapFilterIndex(df), repeat=1)
+    index = BitmapFilterIndex(df)
+    print(f"Construção do índice: {build:.3f}s")
+
+    todos = {column: index.options(column) for column in ['REGIAO', 'REGIAO_CIDADE', 'ESTADO', 'SEXO', 'Status', 'PLANO', 'TIPO_CARGO']}
+    cenarios = {
+        'padrão (tudo selecionado)': (todos, (18, 69)),
+        'um estado a menos': ({**todos, 'ESTADO': todos['ESTADO'][1:]}, (18, 69)),
+        'seleção restrita': ({**todos, 'REGIAO': ['Sudeste'], 'SEXO': ['F'], 'PLANO': ['Plano A']}, (25, 40)),
+    }
+    for nome, (selecoes, faixa) in cenarios.items():
+        esperado = isin_mask(df, selecoes, faixa)
+        np.testing.assert_array_equal(index.resolve(selecoes, faixa), esperado)
+
+        t_isin = _best(lambda: isin_mask(df, selecoes, faixa))
+        t_frio = _best(lambda: BitmapFilterIndex._compute_column_mask(index, 'ESTADO', selecoes['ESTADO']))
+        t_quente = _best(lambda: index.resolve(selecoes, faixa))
+        print(f"{nome}: isin {t_isin * 1e3:.1f}ms | bitmap (cache quente) {t_quente * 1e3:.1f}ms "
+              f"| recalcular uma coluna {t_frio * 1e3:.1f}ms ({t_isin / t_quente:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,129 @@
+"""
+Gerador de dados sintéticos no formato de `data/dadosregiao.csv`.
+As distribuições imitam a base real: concentração no estado do Rio de Janeiro (capital e
+Baixada Fluminense), bairros do Rio vindos de `BAIRROS_RIO`, grafias inconsistentes de
+bairros e uma pequena fração de funções gerenciais.
+
+Uso: python -m benchmarks.generator <n_linhas> <arquivo.csv> [semente]
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.constants import BAIRROS_RIO, OUTRAS_LOCALIDADES
+
+# Cidades por UF com pesos relativos de colaboradores
+CIDADES = {
+    'RJ': [('Rio de Janeiro', 55), ('Nova Iguaçu', 6), ('Duque de Caxias', 5), ('São Gonçalo', 5), ('Niterói', 4),
+           ('Belford Roxo', 3), ('Mesquita', 2), ('Queimados', 1), ('Nilópolis', 1), ('Petrópolis', 1), ('Macaé', 1)],
+    'SP': [('São Paulo', 10), ('Campinas', 2), ('Guarulhos', 1), ('Santos', 1)],
+    'MG': [('Belo Horizonte', 4), ('Juiz de Fora', 1), ('Uberlândia', 1)],
+    'ES': [('Vitória', 2), ('Vila Velha', 1)],
+    'DF': [('Brasília', 3)],
+    'GO': [('Goiânia', 1)],
+    'BA': [('Salvador', 3)],
+    'PE': [('Recife', 2)],
+    'CE': [('Fortaleza', 2)],
+    'RN': [('Natal', 1), ('Mossoró', 0.3)],
+    'PA': [('Belém', 1)],
+    'AM': [('Manaus', 1)],
+    'PR': [('Curitiba', 2)],
+    'SC': [('Florianópolis', 1)],
+    'RS': [('Porto Alegre', 2)],
+}
+
+FUNCOES = [
+    ('AUXILIAR DE COZINHA', 20), ('COZINHEIRO', 14), ('ATENDENTE', 18), ('GARCOM', 10), ('CAIXA', 8),
+    ('AUXILIAR DE SERVICOS GERAIS', 7), ('ESTOQUISTA', 4), ('AUXILIAR ADMINISTRATIVO', 4), ('MOTORISTA', 2),
+    ('SUBGERENTE DE LOJA', 3), ('GERENTE DE LOJA', 3), ('GERENTE REGIONAL', 0.5), ('SUPERVISOR DE OPERACOES', 2),
+    ('DIRETOR DE OPERACOES', 0.1), ('CONTROLLER', 0.2), ('CHEF EXECUTIVO DE COZINHA', 0.3),
+]
+
+BAIRROS_GENERICOS = ['CENTRO', 'JARDIM AMERICA', 'VILA NOVA', 'SANTA ROSA', 'BOA VISTA', 'INDUSTRIAL', 'SAO JOSE']
+
+SITUACOES = [('A', 'Ativo', 85), ('F', 'Férias', 9), ('E', 'Afastado', 6)]
+PLANOS = [('Plano A', 45), ('Plano B', 35), ('Sem plano', 20)]
+
+COLUMNS = ['CHAPA', 'UNIDADE', 'FUNÇÃO', 'SEXO', 'DT_NASCIMENTO', 'BAIRRO', 'CIDADE', 'ESTADO',
+           'CEP', 'CODSITUACAO', 'PLANO', 'Status']
+
+# Linhas geradas por bloco ao gravar arquivos grandes
+WRITE_CHUNK_ROWS = 500_000
+
+
+def _weighted(rng: np.random.Generator, options: list, n: int) -> np.ndarray:
+    """Sorteia índices de `options` (pares valor/peso) proporcionalmente aos pesos."""
+    pesos = np.array([opcao[-1] for opcao in options], dtype='float64')
+    return rng.choice(len(options), size=n, p=pesos / pesos.sum())
+
+
+def _messy(rng: np.random.Generator, bairros: np.ndarray) -> np.ndarray:
+    """Introduz variações de caixa e espaços em parte dos bairros, como na exportação real."""
+    bairros = bairros.astype(object)
+    sujos = rng.random(len(bairros)) < 0.05
+    bairros[sujos] = [f" {b.title()} " for b in bairros[sujos]]
+    return bairros
+
+
+def generate_employees(n: int, seed: int = 0, start_id: int = 0) -> pd.DataFrame:
+    """Gera `n` colaboradores sintéticos com as colunas de `dadosregiao.csv` (tudo como texto)."""
+    rng = np.random.default_rng(seed)
+
+    cidades = [(cidade, uf, peso) for uf, lista in CIDADES.items() for cidade, peso in lista]
+    escolha_cidade = _weighted(rng, cidades, n)
+    cidade = np.array([c[0] for c in cidades], dtype=object)[escolha_cidade]
+    estado = np.array([c[1] for c in cidades], dtype=object)[escolha_cidade]
+
+    bairros_rio = np.array(sorted(b for bairros in BAIRROS_RIO.values() for b in bairros) + ['JARDIM NOVO'], dtype=object)
+    bairros_baixada = np.array(list(OUTRAS_LOCALIDADES) + BAIRROS_GENERICOS, dtype=object)
+    bairro = rng.choice(np.array(BAIRROS_GENERICOS, dtype=object), n)
+    no_rio = cidade == 'Rio de Janeiro'
+    bairro[no_rio] = rng.choice(bairros_rio, no_rio.sum())
+    na_baixada = np.isin(cidade, ['Nova Iguaçu', 'Belford Roxo', 'Mesquita', 'Queimados', 'Nilópolis'])
+    bairro[na_baixada] = rng.choice(bairros_baixada, na_baixada.sum())
+    bairro = _messy(rng, bairro)
+
+    funcao = np.array([f[0] for f in FUNCOES], dtype=object)[_weighted(rng, FUNCOES, n)]
+    situacao = _weighted(rng, SITUACOES, n)
+    plano = np.array([p[0] for p in PLANOS], dtype=object)[_weighted(rng, PLANOS, n)]
+
+    # Datas de nascimento entre 18 e 70 anos, formatadas uma vez por data distinta
+    dias = rng.integers(18 * 365, 70 * 365, n)
+    codigos, dias_unicos = pd.factorize(dias)
+    datas = (pd.Timestamp('2025-01-01') - pd.to_timedelta(dias_unicos, unit='D')).strftime('%d/%m/%Y')
+    nascimento = np.asarray(datas, dtype=object)[codigos]
+    nascimento[rng.random(n) < 0.002] = ''
+
+    cep = pd.Series(rng.integers(1_000_000, 99_999_999, n)).astype(str).str.zfill(8)
+
+    return pd.DataFrame({
+        'CHAPA': pd.Series(np.arange(start_id, start_id + n)).astype(str).str.zfill(7).to_numpy(),
+        'UNIDADE': np.char.add('U', rng.integers(1, 300, n).astype(str).astype('U3')).astype(object),
+        'FUNÇÃO': funcao,
+        'SEXO': rng.choice(np.array(['F', 'M'], dtype=object), n),
+        'DT_NASCIMENTO': nascimento,
+        'BAIRRO': bairro,
+        'CIDADE': cidade,
+        'ESTADO': estado,
+        'CEP': (cep.str[:5] + '-' + cep.str[5:]).to_numpy(),
+        'CODSITUACAO': np.array([s[0] for s in SITUACOES], dtype=object)[situacao],
+        'PLANO': plano,
+        'Status': np.array([s[1] for s in SITUACOES], dtype=object)[situacao],
+    }, columns=COLUMNS)
+
+
+def write_dataset(path: Path, n: int, seed: int = 0, chunk_rows: int = WRITE_CHUNK_ROWS) -> Path:
+    """Grava um CSV sintético de `n` linhas em blocos, com a mesma formatação da exportação real."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as arquivo:
+        for i, inicio in enumerate(range(0, n, chunk_rows)):
+            bloco = generate_employees(min(chunk_rows, n - inicio), seed=seed + i, start_id=inicio)
+            bloco.to_csv(arquivo, sep=';', index=False, header=(inicio == 0))
+    return path
+
+
+if __name__ == "__main__":
+    write_dataset(Path(sys.argv[2]), int(sys.argv[1]), int(sys.argv[3]) if len(sys.argv) > 3 else 0)
@@ -0,0 +1,301 @@
+"""
+Suíte de benchmarks da pipeline e do dashboard sobre dados sintéticos.
+
+Para cada tamanho de conjunto mede:
+- cada etapa de `PIPELINE` isoladamente (entrada = saída das etapas anteriores);
+- a carga completa (`load_and_process_data`) e a carga via cache em disco (fria e quente);
+- o caminho de filtros e agregações do dashboard (cubo, bitmaps, mapa e tabela).
+
+Cada benchmark registra o tempo de `--repeat` execuções e o pico de memória de uma execução
+adicional: o pico de RSS do processo (VmHWM, zerado antes da execução, no Linux) e o pico
+de alocações rastreadas pelo tracemalloc (NumPy/pandas; buffers do Arrow não são rastreados).
+O resultado é gravado em JSON com o commit, para comparação entre versões.
+
+Uso:
+    python -m benchmarks.run --sizes 10k 100k --output bench-<commit>.json
+    python -m benchmarks.run --compare bench-base.json bench-novo.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.generator import write_dataset
+from src.cube import CUBE_DIMENSIONS, build_cube
+from src.filters import FILTER_COLUMNS, BitmapFilterIndex
+from src.processing import DTYPE_SPEC, PIPELINE, load_and_process_data, load_cached_data, refresh_ages
+from src.spatial import MAP_LEVELS, SpatialGridIndex
+from src.table import PaginatedTable
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+DATA_DIR = Path(os.environ.get('DADOSREGIAO_BENCH_DIR', '.cache/bench'))
+SCHEMA_VERSION = 1
+
+# Variação relativa a partir da qual a comparação aponta regressão
+REGRESSION_THRESHOLD = 0.10
+
+# Gráficos de distribuição renderizados pelo dashboard
+CHART_DIMENSIONS = ['REGIAO', 'ESTADO', 'REGIAO_CIDADE', 'SEXO', 'TIPO_CARGO', 'PLANO', 'Status', 'IDADE']
+
+
+@dataclass
+class Benchmark:
+    group: str
+    name: str
+    run: Callable
+    setup: Callable = lambda: ()
+
+
+def _git_commit() -> tuple[str | None, bool]:
+    """Commit atual e se há alterações não commitadas no código medido."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--', 'src', 'app.py', 'benchmarks'],
+                                capture_output=True, text=True, check=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def _read_proc_status(field: str) -> int | None:
+    try:
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith(field + ':'):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Zera o pico de RSS do processo (VmHWM); disponível apenas no Linux."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def measure(benchmark: Benchmark, repeat: int) -> dict:
+    """Executa um benchmark `repeat` vezes para tempo e uma vez adicional para memória."""
+    tempos = []
+    for _ in range(repeat):
+        args = benchmark.setup()
+        gc.collect()
+        inicio = time.perf_counter()
+        benchmark.run(*args)
+        tempos.append(time.perf_counter() - inicio)
+        del args
+
+    args = benchmark.setup()
+    gc.collect()
+    rss_antes = _read_proc_status('VmRSS')
+    rss_zerado = _reset_peak_rss()
+    benchmark.run(*args)
+    pico_rss = _read_proc_status('VmHWM') if rss_zerado else None
+
+    # O tracemalloc desacelera o código Python; por isso roda separado das medições de tempo
+    gc.collect()
+    tracemalloc.start()
+    benchmark.run(*args)
+    _, pico_rastreado = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del args
+
+    return {
+        'group': benchmark.group,
+        'name': benchmark.name,
+        'seconds': tempos,
+        'min_seconds': min(tempos),
+        'median_seconds': statistics.median(tempos),
+        'rss_before_bytes': rss_antes,
+        'peak_rss_delta_bytes': pico_rss - rss_antes if pico_rss is not None and rss_antes is not None else None,
+        'peak_traced_bytes': pico_rastreado,
+    }
+
+
+def dataset_path(size: str, seed: int, data_dir: Path = DATA_DIR) -> Path:
+    """Gera (uma única vez por tamanho e semente) o CSV sintético e retorna o caminho."""
+    path = data_dir / f"dadosregiao-{size}-{seed}.csv"
+    if not path.exists():
+        print(f"Gerando {path} ({SIZES[size]:,} linhas)...", file=sys.stderr)
+        temporario = path.with_suffix('.tmp')
+        write_dataset(temporario, SIZES[size], seed=seed)
+        temporario.replace(path)
+    return path
+
+
+def pipeline_benchmarks(csv_path: Path, cache_dir: Path) -> Iterator[Benchmark]:
+    """Leitura do CSV, cada etapa da pipeline e as cargas completas."""
+    def read_csv():
+        return pd.read_csv(csv_path, sep=';', encoding='utf-8-sig', on_bad_lines='warn', dtype=DTYPE_SPEC)
+
+    yield Benchmark('pipeline', 'read_csv', read_csv)
+
+    # Cada etapa recebe uma cópia da saída das anteriores; só a entrada atual fica em memória
+    entrada = read_csv()
+    for stage in PIPELINE:
+        yield Benchmark('stage', stage.__name__, stage, setup=lambda df=entrada: (df.copy(),))
+        entrada = stage(entrada)
+    del entrada
+
+    yield Benchmark('pipeline', 'load_and_process_data', lambda: load_and_process_data(str(csv_path)))
+
+    def limpar_cache():
+        for snapshot in cache_dir.glob('*'):
+            snapshot.unlink()
+        return ()
+
+    yield Benchmark('pipeline', 'load_cached_data_cold',
+                    lambda: load_cached_data(str(csv_path), cache_dir=cache_dir), setup=limpar_cache)
+    yield Benchmark('pipeline', 'load_cached_data_warm', lambda: load_cached_data(str(csv_path), cache_dir=cache_dir))
+
+
+def dashboard_benchmarks(df: pd.DataFrame) -> Iterator[Benchmark]:
+    """Construção dos índices e uma execução completa de filtros, gráficos, mapa e tabela."""
+    # Atualização diária das idades, sem reprocessar as demais colunas
+    yield Benchmark('index', 'refresh_ages', lambda: refresh_ages(df, date(2030, 1, 1)))
+    yield Benchmark('index', 'build_cube', lambda: build_cube(df))
+    yield Benchmark('index', 'BitmapFilterIndex', lambda: BitmapFilterIndex(df))
+    yield Benchmark('index', 'SpatialGridIndex', lambda: SpatialGridIndex.from_frame(df))
+    yield Benchmark('index', 'PaginatedTable', lambda: PaginatedTable(df))
+
+    cube = build_cube(df)
+    spatial_index = SpatialGridIndex.from_frame(df)
+    table_view = PaginatedTable(df)
+    todos = {column: cube.options(column) for column in CUBE_DIMENSIONS if column != 'IDADE'}
+    idades = cube.options('IDADE')
+    faixa = (int(min(idades)), int(max(idades))) if idades else (0, 0)
+    cenarios = {
+        'all': todos,
+        'narrow': {**todos, 'REGIAO': todos['REGIAO'][:1], 'SEXO': todos['SEXO'][:1], 'PLANO': todos['PLANO'][:1]},
+    }
+
+    for cenario, selecoes in cenarios.items():
+        # Índice novo a cada repetição: mede o caminho sem as máscaras em cache
+        yield Benchmark('filter', f'resolve_{cenario}', lambda index, s=selecoes: index.resolve(s, faixa),
+                        setup=lambda: (BitmapFilterIndex(df, FILTER_COLUMNS),))
+
+        def charts(s=selecoes):
+            celulas = cube.mask(s, faixa)
+            cube.total(celulas)
+            cube.mean_age(celulas)
+            for dimension in CHART_DIMENSIONS:
+                cube.distribution(dimension, celulas)
+
+        yield Benchmark('aggregate', f'cube_charts_{cenario}', charts)
+
+        linhas = BitmapFilterIndex(df).resolve(selecoes, faixa)
+        for level in MAP_LEVELS:
+            yield Benchmark('aggregate', f'map_{level.lower()}_{cenario}',
+                            lambda m=linhas, lv=level: spatial_index.aggregate(m, lv))
+        yield Benchmark('aggregate', f'table_page_{cenario}',
+                        lambda m=linhas: table_view.page(table_view.select(m, 'CIDADE', True, None), 1, 100))
+        yield Benchmark('aggregate', f'table_search_{cenario}',
+                        lambda m=linhas: table_view.page(table_view.select(m, None, True, 'gerente'), 1, 100))
+
+
+def run_size(size: str, repeat: int, seed: int, only: set | None) -> list[dict]:
+    csv_path = dataset_path(size, seed)
+    resultados = []
+
+    def executar(benchmarks: Iterator[Benchmark]) -> None:
+        for benchmark in benchmarks:
+            if only and benchmark.group not in only:
+                continue
+            resultado = {'size': size, 'rows': SIZES[size], **measure(benchmark, repeat)}
+            resultados.append(resultado)
+            print(f"[{size}] {benchmark.group}/{benchmark.name}: {resultado['median_seconds'] * 1e3:.1f}ms "
+                  f"(pico rastreado {resultado['peak_traced_bytes'] / 2**20:.1f} MiB)", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory(prefix='bench-cache-') as cache_dir:
+        executar(pipeline_benchmarks(csv_path, Path(cache_dir)))
+        df = load_and_process_data(str(csv_path))
+        executar(dashboard_benchmarks(df))
+    return resultados
+
+
+def run(sizes: list[str], repeat: int, seed: int, only: set | None = None) -> dict:
+    commit, dirty = _git_commit()
+    return {
+        'schema': SCHEMA_VERSION,
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'pyarrow': pa.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': [resultado for size in sizes for resultado in run_size(size, repeat, seed, only)],
+    }
+
+
+def compare(base: dict, novo: dict, threshold: float = REGRESSION_THRESHOLD) -> bool:
+    """Imprime a variação de tempo e memória por benchmark. Retorna True se houve regressão."""
+    anteriores = {(r['size'], r['group'], r['name']): r for r in base['results']}
+    print(f"base {base['meta']['commit']} -> novo {novo['meta']['commit']}")
+    regressao = False
+    for r in novo['results']:
+        anterior = anteriores.get((r['size'], r['group'], r['name']))
+        if anterior is None:
+            print(f"{r['size']:>5} {r['group']}/{r['name']}: novo benchmark")
+            continue
+        tempo = r['median_seconds'] / anterior['median_seconds'] - 1
+        memoria = (r['peak_traced_bytes'] / anterior['peak_traced_bytes'] - 1) if anterior['peak_traced_bytes'] else 0.0
+        marca = ''
+        if tempo > threshold or memoria > threshold:
+            marca, regressao = '  <-- regressão', True
+        print(f"{r['size']:>5} {r['group']}/{r['name']}: tempo {tempo:+.1%} "
+              f"({anterior['median_seconds'] * 1e3:.1f} -> {r['median_seconds'] * 1e3:.1f}ms), memória {memoria:+.1%}{marca}")
+    return regressao
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['10k', '100k'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=['pipeline', 'stage', 'index', 'filter', 'aggregate'])
+    parser.add_argument('--output', type=Path, help="Arquivo JSON de saída (padrão: stdout).")
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('BASE', 'NOVO'),
+                        help="Compara dois resultados em JSON em vez de executar os benchmarks.")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        base, novo = (json.loads(path.read_text()) for path in args.compare)
+        return 1 if compare(base, novo, args.threshold) else 0
+
+    resultado = json.dumps(run(args.sizes, args.repeat, args.seed, set(args.only) if args.only else None), indent=2)
+    if args.output:
+        args.output.write_text(resultado + "\n")
+    else:
+        print(resultado)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
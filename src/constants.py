@@ -15,7 +15,20 @@ BAIRROS_RIO = {
     'Rio_Zona Oeste': {'ANIL', 'BARRA DA TIJUCA', 'BARRA DE GUARATIBA', 'CAMORIM', 'CIDADE DE DEUS', 'CURICICA', 'FREGUESIA (JACAREPAGUÁ)', 'GARDÊNIA AZUL', 'GRUMARI', 'ITANHANGÁ', 'JACAREPAGUÁ', 'JOÁ', 'PECHINCHA', 'RECREIO DOS BANDEIRANTES', 'TANQUE', 'TAQUARA', 'VARGEM GRANDE', 'VARGEM PEQUENA', 'CAMPO GRANDE', 'SANTISSIMO', 'SENADOR CAMARA', 'COSMOS', 'INHOAIBA', 'GUARATIBA', 'SEPETIBA', 'SANTA CRUZ', 'AUGUSTO VASCONCELOS', 'RIO DAS PEDRAS', 'MUZEMA', 'CHATUBA', 'GARDENIA AZUL', 'JACAREPAGUA', 'BARBANTE', 'FREGUESIA'}
 }
 
+# Índice invertido bairro -> região, para classificação vetorizada com Series.map
+BAIRRO_PARA_REGIAO_RIO = {
+    bairro: regiao for regiao, bairros_na_regiao in BAIRROS_RIO.items() for bairro in bairros_na_regiao
+}
+
 OUTRAS_LOCALIDADES = {
     'NOVA ERA': 'Nova Iguaçu', 'AUSTIN': 'Nova Iguaçu', 'XANGRILÁ': 'Belford Roxo',
     'MESQUITA': 'Mesquita', 'SANTO EXPEDITO': 'Queimados', 'NILÓPOLIS': 'Nilópolis'
-}
\ No newline at end of file
+}
+
+# Códigos de estado (admin1) do GeoNames para o Brasil, usados na geração da tabela de municípios
+CODIGOS_UF_GEONAMES = {
+    '01': 'AC', '02': 'AL', '03': 'AP', '04': 'AM', '05': 'BA', '06': 'CE', '07': 'DF', '08': 'ES',
+    '11': 'MS', '13': 'MA', '14': 'MT', '15': 'MG', '16': 'PA', '17': 'PB', '18': 'PR', '20': 'PI',
+    '21': 'RJ', '22': 'RN', '23': 'RS', '24': 'RO', '25': 'RR', '26': 'SC', '27': 'SP', '28': 'SE',
+    '29': 'GO', '30': 'PE', '31': 'TO'
+}
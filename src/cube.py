@@ -0,0 +1,177 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Dimensões dos filtros do dashboard, na ordem da barra lateral
+CUBE_DIMENSIONS = ['REGIAO', 'REGIAO_CIDADE', 'ESTADO', 'SEXO', 'Status', 'PLANO', 'TIPO_CARGO', 'IDADE']
+
+
+class EmployeeCube:
+    """
+    Cubo pré-agregado (contagem e soma de idades) sobre as dimensões de filtro do dashboard.
+    Cada célula é uma combinação distinta dos códigos inteiros das dimensões; KPIs e gráficos
+    são calculados por somas agrupadas sobre as células, sem acessar os dados linha a linha.
+    """
+
+    def __init__(self, codes: dict[str, np.ndarray], categories: dict[str, pd.Index],
+                 counts: np.ndarray, age_sums: np.ndarray):
+        self.dimensions = list(codes)
+        self.codes = codes
+        self.categories = categories
+        self.counts = counts
+        self.age_sums = age_sums
+        self._cell_index = None
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def options(self, dimension: str) -> list:
+        """
+        Valores disponíveis (ordenados, sem nulos) para o filtro da dimensão. Só entram valores
+        com colaboradores: após `apply_delta`, categorias cujas linhas saíram continuam no cubo.
+        """
+        codigos = self.codes[dimension]
+        validos = codigos >= 0
+        contagens = np.bincount(codigos[validos], weights=self.counts[validos], minlength=len(self.categories[dimension]))
+        return sorted(self.categories[dimension][contagens > 0])
+
+    def mask(self, selections: dict[str, list], age_range: tuple[int, int] | None = None) -> np.ndarray:
+        """Máscara booleana das células que atendem aos filtros (equivalente à cadeia de `isin`)."""
+        mask = np.ones(len(self), dtype=bool)
+        for dimension, selected in selections.items():
+            # Posição extra ao final corresponde ao código -1 (valor ausente), nunca selecionado
+            allowed = np.zeros(len(self.categories[dimension]) + 1, dtype=bool)
+            allowed[self.categories[dimension].get_indexer(list(selected))] = True
+            allowed[-1] = False
+            mask &= allowed[self.codes[dimension]]
+        if age_range is not None:
+            idades = self.categories['IDADE'].to_numpy()[self.codes['IDADE']]
+            mask &= (idades >= age_range[0]) & (idades <= age_range[1])
+        return mask
+
+    def total(self, mask: np.ndarray) -> int:
+        """Número de colaboradores nas células selecionadas."""
+        return int(self.counts[mask].sum())
+
+    def mean_age(self, mask: np.ndarray) -> float:
+        """Idade média dos colaboradores nas células selecionadas (NaN se vazio)."""
+        total = self.counts[mask].sum()
+        return float(self.age_sums[mask].sum() / total) if total else float('nan')
+
+    def distribution(self, dimension: str, mask: np.ndarray) -> pd.DataFrame:
+        """Contagem por valor da dimensão, no mesmo formato de `value_counts().reset_index()`."""
+        categorias = self.categories[dimension]
+        codigos = self.codes[dimension][mask]
+        validos = codigos >= 0
+        contagens = np.bincount(codigos[validos], weights=self.counts[mask][validos], minlength=len(categorias))
+        dist = pd.DataFrame({dimension: categorias, 'Quantidade': contagens.astype('int64')})
+        dist = dist[dist['Quantidade'] > 0]
+        return dist.sort_values('Quantidade', ascending=False, kind='stable').reset_index(drop=True)
+
+    def _encode(self, dimension: str, values: pd.Series) -> np.ndarray:
+        """Códigos dos valores na dimensão, acrescentando ao final as categorias ainda não vistas."""
+        categorias = self.categories[dimension]
+        values = values.astype('float64' if dimension == 'IDADE' else object)
+        novos = pd.Index(values.dropna().unique()).difference(categorias)
+        if len(novos):
+            categorias = categorias.append(novos.astype('int64') if dimension == 'IDADE' else novos)
+            self.categories[dimension] = categorias
+        return categorias.get_indexer(values)
+
+    def copy(self) -> "EmployeeCube":
+        """Cópia independente do cubo (proporcional ao número de células), para atualizar sem afetar leitores."""
+        cube = EmployeeCube(
+            codes={dimension: codigos.copy() for dimension, codigos in self.codes.items()},
+            categories=dict(self.categories),
+            counts=self.counts.copy(),
+            age_sums=self.age_sums.copy(),
+        )
+        if self._cell_index is not None:
+            cube._cell_index = dict(self._cell_index)
+        return cube
+
+    def apply_delta(self, removed: pd.DataFrame, added: pd.DataFrame) -> None:
+        """
+        Atualiza o cubo no lugar a partir de uma atualização incremental: subtrai as linhas
+        removidas (ou versões anteriores de linhas alteradas) e soma as linhas novas.
+        """
+        if self._cell_index is None:
+            self._cell_index = {
+                celula: posicao for posicao, celula in enumerate(zip(*(self.codes[d] for d in self.dimensions)))
+            }
+
+        n_celulas = len(self.counts)
+        novas_celulas, novas_quantidades, novas_somas = [], [], []
+        for frame, sinal in ((removed, -1), (added, 1)):
+            frame = frame[frame['IDADE'].notna()]
+            if frame.empty:
+                continue
+            codes = pd.DataFrame({d: self._encode(d, frame[d]) for d in self.dimensions})
+            codes['SOMA_IDADE'] = frame['IDADE'].to_numpy(dtype='float64')
+            delta = codes.groupby(self.dimensions, sort=False).agg(
+                QUANTIDADE=('SOMA_IDADE', 'size'), SOMA_IDADE=('SOMA_IDADE', 'sum')
+            ).reset_index()
+            # O número de células afetadas é proporcional às linhas alteradas, não ao total
+            for *celula, quantidade, soma in delta.itertuples(index=False, name=None):
+                posicao = self._cell_index.get(tuple(celula))
+                if posicao is None:
+                    posicao = n_celulas + len(novas_celulas)
+                    self._cell_index[tuple(celula)] = posicao
+                    novas_celulas.append(celula)
+                    novas_quantidades.append(0)
+                    novas_somas.append(0.0)
+                if posicao < n_celulas:
+                    self.counts[posicao] += sinal * quantidade
+                    self.age_sums[posicao] += sinal * soma
+                else:
+                    novas_quantidades[posicao - n_celulas] += sinal * quantidade
+                    novas_somas[posicao - n_celulas] += sinal * soma
+
+        if novas_celulas:
+            self.counts = np.concatenate([self.counts, np.asarray(novas_quantidades, dtype='int64')])
+            self.age_sums = np.concatenate([self.age_sums, np.asarray(novas_somas, dtype='float64')])
+            novas = np.asarray(novas_celulas, dtype='int64')
+            for i, dimension in enumerate(self.dimensions):
+                dtype = _code_dtype(len(self.categories[dimension]))
+                self.codes[dimension] = np.concatenate([self.codes[dimension], novas[:, i]]).astype(dtype)
+        logger.info(f"Cubo atualizado: {len(novas_celulas)} células novas, {len(self)} no total.")
+
+
+def build_cube(df: pd.DataFrame, dimensions: list[str] = CUBE_DIMENSIONS) -> EmployeeCube:
+    """
+    Constrói o cubo a partir do DataFrame processado.
+    Linhas sem idade são descartadas, pois o filtro de faixa etária do dashboard sempre as exclui.
+    """
+    categories = {}
+    code_columns = {}
+    for dimension in dimensions:
+        codigos, valores = pd.factorize(df[dimension], sort=True)
+        valores = np.asarray(valores, dtype='int64' if dimension == 'IDADE' else object)
+        categories[dimension] = pd.Index(valores)
+        code_columns[dimension] = codigos
+
+    codes = pd.DataFrame(code_columns)
+    codes = codes[df['IDADE'].notna().to_numpy()]
+    idades = categories['IDADE'].to_numpy(dtype='float64')[codes['IDADE'].to_numpy()]
+    codes['SOMA_IDADE'] = idades
+
+    cells = codes.groupby(dimensions, sort=False).agg(
+        QUANTIDADE=('SOMA_IDADE', 'size'), SOMA_IDADE=('SOMA_IDADE', 'sum')
+    ).reset_index()
+    logger.info(f"Cubo construído: {len(cells)} células para {len(codes)} colaboradores.")
+
+    return EmployeeCube(
+        codes={dimension: cells[dimension].to_numpy(dtype=_code_dtype(len(categories[dimension])))
+               for dimension in dimensions},
+        categories=categories,
+        counts=cells['QUANTIDADE'].to_numpy(dtype='int64', copy=True),
+        age_sums=cells['SOMA_IDADE'].to_numpy(dtype='float64', copy=True),
+    )
+
+
+def _code_dtype(n_categories: int) -> str:
+    """Menor tipo inteiro com sinal capaz de representar os códigos (incluindo -1)."""
+    return 'int16' if n_categories < np.iinfo('int16').max else 'int32'
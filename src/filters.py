@@ -0,0 +1,143 @@
+import copy
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Colunas dos filtros `multiselect` da barra lateral
+FILTER_COLUMNS = ['REGIAO', 'REGIAO_CIDADE', 'ESTADO', 'SEXO', 'Status', 'PLANO', 'TIPO_CARGO']
+
+# Acima desta cardinalidade a máscara da coluna é resolvida pelos códigos, sem um bitmap por valor
+BITMAP_MAX_CARDINALITY = 64
+
+# Quantidade de seleções recentes guardadas por coluna (compartilhadas entre sessões)
+MASK_CACHE_SIZE = 16
+
+
+class BitmapFilterIndex:
+    """
+    Índice de bitmaps para os filtros do dashboard.
+    Guarda um bitmap compactado (np.packbits) por valor de cada coluna de filtro e um índice
+    ordenado das idades. Uma seleção é resolvida com OR entre os valores escolhidos e AND
+    entre as colunas; a máscara de cada coluna fica em cache, de modo que alterar um filtro
+    recalcula apenas a máscara daquela coluna.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list[str] = FILTER_COLUMNS):
+        self.n_rows = len(df)
+        self._codes = {}
+        self._values = {}
+        self._bitmaps = {}
+        self._valid = {}
+        for column in columns:
+            codigos, valores = pd.factorize(df[column], sort=True)
+            self._codes[column] = codigos.astype('int32')
+            self._values[column] = pd.Index(np.asarray(valores, dtype=object))
+            self._valid[column] = np.packbits(codigos >= 0)
+            if len(valores) <= BITMAP_MAX_CARDINALITY:
+                self._bitmaps[column] = [np.packbits(codigos == i) for i in range(len(valores))]
+
+        self._index_ages(df['IDADE'])
+
+        self._cache = {column: OrderedDict() for column in [*columns, 'IDADE']}
+        self._lock = threading.Lock()
+        logger.info(f"Índice de filtros construído para {self.n_rows} registros e {len(columns)} colunas.")
+
+    def _index_ages(self, idades: pd.Series) -> None:
+        """Índice ordenado das idades (posições das linhas e idades em ordem crescente, sem nulos)."""
+        idades = idades.to_numpy(dtype='float64', na_value=np.nan)
+        validas = np.flatnonzero(~np.isnan(idades))
+        ordem = np.argsort(idades[validas], kind='stable')
+        self._age_order = validas[ordem]
+        self._sorted_ages = idades[validas][ordem]
+
+    def with_ages(self, idades: pd.Series) -> "BitmapFilterIndex":
+        """
+        Novo índice com as idades recalculadas (mesmas linhas). Os bitmaps e as máscaras em
+        cache das demais colunas são compartilhados; apenas o índice de idades é refeito.
+        """
+        index = copy.copy(self)
+        index._index_ages(idades)
+        with self._lock:
+            index._cache = {column: OrderedDict(cache) for column, cache in self._cache.items()}
+        index._cache['IDADE'] = OrderedDict()
+        index._lock = threading.Lock()
+        return index
+
+    def options(self, column: str) -> list:
+        """Valores disponíveis (ordenados, sem nulos) para o filtro da coluna."""
+        return list(self._values[column])
+
+    def _cached(self, column: str, key, compute):
+        """Consulta o cache LRU da coluna, calculando a máscara apenas quando necessário."""
+        cache = self._cache[column]
+        with self._lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        mask = compute()
+        with self._lock:
+            cache[key] = mask
+            if len(cache) > MASK_CACHE_SIZE:
+                cache.popitem(last=False)
+        return mask
+
+    def column_mask(self, column: str, selected) -> np.ndarray:
+        """Bitmap compactado das linhas cujo valor na coluna está entre os selecionados."""
+        return self._cached(column, frozenset(selected), lambda: self._compute_column_mask(column, selected))
+
+    def _compute_column_mask(self, column: str, selected) -> np.ndarray:
+        indices = self._values[column].get_indexer(list(selected))
+        indices = np.unique(indices[indices >= 0])
+        n_values = len(self._values[column])
+
+        if column not in self._bitmaps:
+            allowed = np.zeros(n_values + 1, dtype=bool)
+            allowed[indices] = True
+            return np.packbits(allowed[self._codes[column]])
+
+        if len(indices) == n_values:
+            return self._valid[column]
+        if len(indices) > n_values // 2:
+            # Mais barato combinar os valores não selecionados e inverter
+            rejected = np.setdiff1d(np.arange(n_values), indices)
+            return self._valid[column] & ~np.bitwise_or.reduce([self._bitmaps[column][i] for i in rejected])
+        mask = np.zeros_like(self._valid[column])
+        for i in indices:
+            mask |= self._bitmaps[column][i]
+        return mask
+
+    def age_mask(self, age_range: tuple[int, int]) -> np.ndarray:
+        """Bitmap compactado das linhas com idade no intervalo fechado, via busca binária."""
+        return self._cached('IDADE', tuple(age_range), lambda: self._compute_age_mask(age_range))
+
+    def _compute_age_mask(self, age_range: tuple[int, int]) -> np.ndarray:
+        inicio = np.searchsorted(self._sorted_ages, age_range[0], side='left')
+        fim = np.searchsorted(self._sorted_ages, age_range[1], side='right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self._age_order[inicio:fim]] = True
+        return np.packbits(mask)
+
+    def resolve(self, selections: dict[str, list], age_range: tuple[int, int] | None = None) -> np.ndarray:
+        """
+        Combina os filtros e retorna a máscara booleana por linha, equivalente à cadeia de
+        `isin` do dashboard (idades nulas são sempre excluídas quando há filtro de idade).
+        """
+        mask = None
+        for column, selected in selections.items():
+            column_mask = self.column_mask(column, selected)
+            mask = column_mask.copy() if mask is None else np.bitwise_and(mask, column_mask, out=mask)
+        if age_range is not None:
+            age_mask = self.age_mask(age_range)
+            mask = age_mask.copy() if mask is None else np.bitwise_and(mask, age_mask, out=mask)
+        if mask is None:
+            return np.ones(self.n_rows, dtype=bool)
+        return np.unpackbits(mask, count=self.n_rows).view(bool)
+
+    def positions(self, selections: dict[str, list], age_range: tuple[int, int] | None = None) -> np.ndarray:
+        """Posições (para `DataFrame.iloc`) das linhas que atendem aos filtros."""
+        return np.flatnonzero(self.resolve(selections, age_range))
@@ -0,0 +1,199 @@
+import hashlib
+import io
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.constants import CODIGOS_UF_GEONAMES
+
+logger = logging.getLogger(__name__)
+
+GEOCODER_PATH = Path(__file__).parent / "data" / "municipios.parquet"
+GEOCODER_VERSION = "1"
+
+# Fontes fixadas da tabela: artefatos do PyPI em versão exata, verificados pelo SHA-256.
+# Os nomes oficiais dos municípios por UF (IBGE) vêm do brutils; as coordenadas das sedes,
+# do recorte cities500 do GeoNames (CC BY 4.0) distribuído no geonamescache.
+FONTE_NOMES = ('brutils==2.5.0', 'brutils/data/cities_code.json',
+               '5c9c66753cdc643356010e2fb9158baa18cb5daede28e247ede905c15239c396')
+FONTE_COORDENADAS = ('geonamescache==3.0.2', 'geonamescache/data/cities500.json',
+                     'b830e8942f2d58c7e68782dcf4dff2ffe8c4104a35ee881ed1ad4023cefcdba4')
+
+# Sedes ausentes do recorte do GeoNames (coordenadas da sede municipal)
+COORDENADAS_COMPLEMENTARES = {
+    ('mesquita', 'RJ'): (-22.7828, -43.4297),
+}
+
+
+def normalize_keys(cidades: pd.Series, ufs: pd.Series) -> pd.Series:
+    """Gera a chave normalizada 'CIDADE|UF' (maiúsculas, sem acentos e espaços extras)."""
+    cidades = (
+        cidades.astype(str)
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.upper()
+        .str.split()
+        .str.join(' ')
+    )
+    return cidades + '|' + ufs.astype(str).str.strip().str.upper()
+
+
+def _match_keys(cidades: pd.Series, ufs: pd.Series) -> pd.Series:
+    """Chave tolerante usada só para casar as duas fontes: ignora apóstrofos, hífens e parênteses."""
+    cidades = cidades.astype(str).str.replace(r"\(.*?\)", ' ', regex=True).str.replace("'", '', regex=False)
+    chaves = normalize_keys(cidades, ufs).str.replace(r"[^A-Z0-9|]+", ' ', regex=True)
+    return chaves.str.split().str.join(' ')
+
+
+def _read_pinned(fonte: tuple[str, str, str], wheels_dir: Path) -> bytes:
+    """Obtém (via pip, do índice configurado) a wheel fixada, confere o hash e lê o arquivo de dados."""
+    requisito, membro, sha256 = fonte
+    nome = requisito.split('==')[0]
+    wheels = sorted(wheels_dir.glob(f"{nome}-*.whl"))
+    if not wheels:
+        subprocess.run([sys.executable, '-m', 'pip', 'download', '--no-deps', '--only-binary=:all:',
+                        '--dest', str(wheels_dir), requisito], check=True)
+        wheels = sorted(wheels_dir.glob(f"{nome}-*.whl"))
+    conteudo = wheels[-1].read_bytes()
+    if hashlib.sha256(conteudo).hexdigest() != sha256:
+        raise ValueError(f"Hash inesperado para {wheels[-1].name}; a fonte fixada {requisito} não confere.")
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as wheel:
+        return wheel.read(membro)
+
+
+def build_geocoder_table(dest: Path = GEOCODER_PATH, wheels_dir: Path | None = None) -> Path:
+    """
+    Gera a tabela colunar compacta distribuída com a aplicação a partir das fontes fixadas:
+    cada município oficial (nome e UF) recebe as coordenadas da localidade homônima mais
+    populosa do GeoNames na mesma UF. A tabela gerada é versionada em `src/data/`.
+    Args:
+        dest (Path): Arquivo Parquet de destino.
+        wheels_dir (Path | None): Diretório com as wheels já baixadas (para gerar sem rede).
+    Returns:
+        Path: O caminho do arquivo gerado.
+    """
+    with tempfile.TemporaryDirectory() as temporario:
+        wheels_dir = Path(wheels_dir or temporario)
+        nomes = json.loads(_read_pinned(FONTE_NOMES, wheels_dir))
+        localidades = json.loads(_read_pinned(FONTE_COORDENADAS, wheels_dir))
+    logger.info(f"Gerando tabela de geocodificação a partir de {FONTE_NOMES[0]} e {FONTE_COORDENADAS[0]}")
+
+    municipios = pd.DataFrame([(nome, uf) for uf, cidades in nomes.items() for nome in cidades], columns=['nome', 'UF'])
+    municipios['MATCH'] = _match_keys(municipios['nome'], municipios['UF'])
+
+    localidades = pd.DataFrame([v for v in localidades.values() if v['countrycode'] == 'BR'])
+    localidades['UF'] = localidades['admin1code'].map(CODIGOS_UF_GEONAMES)
+    # Nome principal tem prioridade sobre os nomes alternativos; entre homônimos, vence o mais populoso
+    candidatos = []
+    for prioridade, coluna in enumerate(['name', 'alternatenames']):
+        nomes_localidades = localidades[['UF', 'latitude', 'longitude', 'population', coluna]].explode(coluna)
+        nomes_localidades = nomes_localidades.dropna(subset=['UF', coluna])
+        candidatos.append(nomes_localidades.assign(
+            MATCH=_match_keys(nomes_localidades[coluna], nomes_localidades['UF']), PRIORIDADE=prioridade
+        ))
+    candidatos = (
+        pd.concat(candidatos, ignore_index=True)
+        .sort_values(['PRIORIDADE', 'population'], ascending=[True, False], kind='stable')
+        .drop_duplicates(subset='MATCH')
+    )
+    municipios = municipios.merge(candidatos[['MATCH', 'latitude', 'longitude']], on='MATCH', how='left')
+    for (nome, uf), (latitude, longitude) in COORDENADAS_COMPLEMENTARES.items():
+        linha = (municipios['nome'] == nome) & (municipios['UF'] == uf) & municipios['latitude'].isna()
+        municipios.loc[linha, ['latitude', 'longitude']] = latitude, longitude
+
+    ausentes = municipios[municipios['latitude'].isna()]
+    if not ausentes.empty:
+        logger.warning(f"{len(ausentes)} municípios sem coordenadas: "
+                       f"{', '.join(ausentes['nome'] + '/' + ausentes['UF'])}")
+    municipios = municipios.dropna(subset=['latitude', 'longitude'])
+
+    tabela = pd.DataFrame({
+        'CHAVE': normalize_keys(municipios['nome'], municipios['UF']),
+        'latitude': municipios['latitude'].astype('float64'),
+        'longitude': municipios['longitude'].astype('float64'),
+    })
+    # Homônimos no mesmo estado não existem no IBGE, mas a normalização pode colapsar grafias
+    tabela = tabela.drop_duplicates(subset='CHAVE').sort_values('CHAVE').reset_index(drop=True)
+
+    arrow_table = pa.Table.from_pandas(tabela, preserve_index=False)
+    arrow_table = arrow_table.replace_schema_metadata({
+        **(arrow_table.schema.metadata or {}),
+        b'geocoder_version': GEOCODER_VERSION.encode(),
+        b'source': f"{FONTE_NOMES[0]} + {FONTE_COORDENADAS[0]}".encode(),
+    })
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(arrow_table, dest, compression='zstd')
+    logger.info(f"Tabela de geocodificação gravada em {dest} ({len(tabela)} municípios).")
+    return dest
+
+
+class MunicipalityGeocoder:
+    """Índice em memória (hash) de coordenadas por (cidade, UF) normalizados."""
+
+    def __init__(self, chaves: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray):
+        self._index = {chave: posicao for posicao, chave in enumerate(chaves)}
+        self._latitudes = np.asarray(latitudes, dtype='float64')
+        self._longitudes = np.asarray(longitudes, dtype='float64')
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @classmethod
+    def from_parquet(cls, path: Path = GEOCODER_PATH) -> "MunicipalityGeocoder":
+        """Carrega a tabela distribuída e valida a versão do formato."""
+        tabela = pq.read_table(path)
+        versao = (tabela.schema.metadata or {}).get(b'geocoder_version', b'').decode()
+        if versao != GEOCODER_VERSION:
+            raise ValueError(f"Versão da tabela de geocodificação incompatível: '{versao}' (esperada '{GEOCODER_VERSION}').")
+        return cls(
+            tabela.column('CHAVE').to_numpy(zero_copy_only=False),
+            tabela.column('latitude').to_numpy(),
+            tabela.column('longitude').to_numpy(),
+        )
+
+    def lookup_codes(self, cidades: pd.Series, ufs: pd.Series) -> np.ndarray:
+        """
+        Retorna, para cada linha, a posição do município na tabela (-1 se não encontrado).
+        A normalização e a consulta ao índice rodam uma vez por par (cidade, UF) distinto.
+        """
+        pares = pd.MultiIndex.from_arrays([cidades.astype(str).to_numpy(), ufs.astype(str).to_numpy()])
+        codigos_pares, pares_unicos = pares.factorize()
+        chaves_unicas = normalize_keys(
+            pd.Series(pares_unicos.get_level_values(0)), pd.Series(pares_unicos.get_level_values(1))
+        )
+        posicoes_unicas = np.fromiter(
+            (self._index.get(chave, -1) for chave in chaves_unicas), dtype='int64', count=len(chaves_unicas)
+        )
+        return posicoes_unicas[codigos_pares]
+
+    def coordinates(self, cidades: pd.Series, ufs: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        """Retorna os vetores de latitude e longitude (NaN para municípios não encontrados)."""
+        codigos = self.lookup_codes(cidades, ufs)
+        encontrados = codigos >= 0
+        latitudes = np.where(encontrados, self._latitudes.take(codigos, mode='clip'), np.nan)
+        longitudes = np.where(encontrados, self._longitudes.take(codigos, mode='clip'), np.nan)
+        return latitudes, longitudes
+
+
+@lru_cache(maxsize=1)
+def load_geocoder(path: Path = GEOCODER_PATH) -> MunicipalityGeocoder:
+    """Carrega (uma única vez por processo) o geocodificador a partir da tabela distribuída."""
+    geocoder = MunicipalityGeocoder.from_parquet(path)
+    logger.info(f"Geocodificador carregado de {path} ({len(geocoder)} municípios).")
+    return geocoder
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_geocoder_table(wheels_dir=Path(sys.argv[1]) if len(sys.argv) > 1 else None)
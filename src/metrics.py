@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    # Importado apenas para as anotações: o servidor de métricas sobe antes do pandas ser carregado
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.environ.get('DADOSREGIAO_METRICS_PORT', 9100))
+
+
+def _process_start_time() -> float:
+    """Instante (epoch) em que o processo foi iniciado; no contêiner, equivale ao início do contêiner."""
+    try:
+        with open('/proc/self/stat') as stat:
+            ticks = int(stat.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as uptime:
+            segundos_ligado = float(uptime.read().split()[0])
+        return time.time() - segundos_ligado + ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+PROCESS_START = _process_start_time()
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Histogram:
+    """Histograma cumulativo no formato do Prometheus (buckets, soma e contagem)."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, limite in enumerate(self.buckets):
+            if value <= limite:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Registro das métricas da pipeline (por etapa) e do dashboard (por seção), exposto em
+    formato Prometheus e como perfil JSON estruturado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._last_run = {}
+        self._last_profile = None
+        self._runs = {'count': 0, 'seconds': 0.0, 'rows': 0}
+        self._sections = {}
+        self._last_rerun = {}
+        self._startup = {}
+
+    def record_stage(self, stage: str, wall: float, cpu: float, rows_in: int, rows_out: int, memory_delta: int) -> None:
+        with self._lock:
+            total = self._stages.setdefault(stage, {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows_in': 0, 'rows_out': 0, 'memory_delta_bytes': 0
+            })
+            for chave, valor in (('calls', 1), ('wall_seconds', wall), ('cpu_seconds', cpu),
+                                 ('rows_in', rows_in), ('rows_out', rows_out), ('memory_delta_bytes', memory_delta)):
+                total[chave] += valor
+                self._last_run.setdefault(stage, dict.fromkeys(total, 0))[chave] += valor
+
+    def merge_stages(self, stages: dict) -> None:
+        """Incorpora os totais por etapa medidos em outro processo (no formato de `to_json`)."""
+        with self._lock:
+            for stage, valores in stages.items():
+                total = self._stages.setdefault(stage, dict.fromkeys(valores, 0))
+                ultima = self._last_run.setdefault(stage, dict.fromkeys(valores, 0))
+                for chave, valor in valores.items():
+                    total[chave] += valor
+                    ultima[chave] += valor
+
+    def record_run(self, seconds: float, rows: int) -> None:
+        """Fecha uma execução completa da pipeline; o perfil da última execução passa a ser o atual."""
+        with self._lock:
+            self._runs['count'] += 1
+            self._runs['seconds'] += seconds
+            self._runs['rows'] = rows
+            self._last_profile = {
+                'seconds': seconds, 'rows': rows,
+                'stages': {stage: dict(valores) for stage, valores in self._last_run.items()},
+            }
+            self._last_run = {}
+
+    def record_section(self, section: str, seconds: float) -> None:
+        with self._lock:
+            self._sections.setdefault(section, _Histogram()).observe(seconds)
+            self._last_rerun[section] = seconds
+
+    def record_startup(self, phase: str, seconds: float) -> None:
+        """Registra (apenas na primeira vez) os segundos desde o início do processo até o fim de uma fase."""
+        with self._lock:
+            self._startup.setdefault(phase, seconds)
+
+    def to_json(self) -> dict:
+        """Perfil estruturado: última execução da pipeline, totais por etapa e seções do dashboard."""
+        with self._lock:
+            return {
+                'startup_seconds': dict(self._startup),
+                'pipeline': {
+                    'runs': self._runs['count'],
+                    'last_run': self._last_profile,
+                    'stages_total': {stage: dict(valores) for stage, valores in self._stages.items()},
+                },
+                'dashboard': {
+                    'last_rerun_seconds': dict(self._last_rerun),
+                    'sections': {
+                        section: {'count': hist.count, 'sum_seconds': hist.sum,
+                                  'mean_seconds': hist.sum / hist.count if hist.count else None}
+                        for section, hist in self._sections.items()
+                    },
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Métricas no formato de exposição de texto do Prometheus."""
+        linhas = []
+
+        def metrica(nome: str, tipo: str, ajuda: str, amostras: list) -> None:
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            linhas.extend(amostras)
+
+        with self._lock:
+            etapas = sorted(self._stages.items())
+            for campo, nome, tipo, ajuda in (
+                ('wall_seconds', 'dadosregiao_pipeline_stage_seconds_total', 'counter', 'Tempo de relógio acumulado por etapa da pipeline.'),
+                ('cpu_seconds', 'dadosregiao_pipeline_stage_cpu_seconds_total', 'counter', 'Tempo de CPU acumulado por etapa da pipeline.'),
+                ('rows_in', 'dadosregiao_pipeline_stage_rows_in_total', 'counter', 'Linhas recebidas por etapa da pipeline.'),
+                ('rows_out', 'dadosregiao_pipeline_stage_rows_out_total', 'counter', 'Linhas produzidas por etapa da pipeline.'),
+                ('calls', 'dadosregiao_pipeline_stage_calls_total', 'counter', 'Execuções (blocos) por etapa da pipeline.'),
+            ):
+                metrica(nome, tipo, ajuda, [f'{nome}{{stage="{stage}"}} {valores[campo]}' for stage, valores in etapas])
+
+            ultima = self._last_profile or {'stages': {}, 'seconds': 0.0, 'rows': 0}
+            metrica('dadosregiao_pipeline_stage_memory_delta_bytes', 'gauge',
+                    'Variação de memória do DataFrame por etapa na última execução.',
+                    [f'dadosregiao_pipeline_stage_memory_delta_bytes{{stage="{stage}"}} {valores["memory_delta_bytes"]}'
+                     for stage, valores in sorted(ultima['stages'].items())])
+            metrica('dadosregiao_pipeline_runs_total', 'counter', 'Execuções completas da pipeline.',
+                    [f"dadosregiao_pipeline_runs_total {self._runs['count']}"])
+            metrica('dadosregiao_pipeline_last_run_seconds', 'gauge', 'Duração da última execução da pipeline.',
+                    [f"dadosregiao_pipeline_last_run_seconds {ultima['seconds']}"])
+            metrica('dadosregiao_dataset_rows', 'gauge', 'Linhas do último DataFrame processado.',
+                    [f"dadosregiao_dataset_rows {self._runs['rows']}"])
+
+            metrica('dadosregiao_startup_seconds', 'gauge',
+                    'Segundos desde o início do processo até o fim de cada fase da inicialização.',
+                    [f'dadosregiao_startup_seconds{{phase="{phase}"}} {segundos}' for phase, segundos in self._startup.items()])
+
+            amostras = []
+            for section, hist in sorted(self._sections.items()):
+                for limite, contagem in zip(hist.buckets, hist.counts):
+                    amostras.append(f'dadosregiao_dashboard_section_seconds_bucket{{section="{section}",le="{limite}"}} {contagem}')
+                amostras.append(f'dadosregiao_dashboard_section_seconds_bucket{{section="{section}",le="+Inf"}} {hist.count}')
+                amostras.append(f'dadosregiao_dashboard_section_seconds_sum{{section="{section}"}} {hist.sum}')
+                amostras.append(f'dadosregiao_dashboard_section_seconds_count{{section="{section}"}} {hist.count}')
+            metrica('dadosregiao_dashboard_section_seconds', 'histogram',
+                    'Tempo de renderização por seção do dashboard a cada execução.', amostras)
+        return "\n".join(linhas) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def profile_stage(func: Callable[['pd.DataFrame'], 'pd.DataFrame'], df: 'pd.DataFrame',
+                  registry: MetricsRegistry = REGISTRY) -> 'pd.DataFrame':
+    """Executa uma etapa da pipeline medindo tempo de relógio, CPU, linhas e memória do DataFrame."""
+    rows_in = len(df)
+    memoria_antes = int(df.memory_usage(deep=True).sum())
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    resultado = func(df)
+    wall, cpu = time.perf_counter() - inicio, time.process_time() - inicio_cpu
+    memoria_depois = int(resultado.memory_usage(deep=True).sum())
+    registry.record_stage(func.__name__, wall, cpu, rows_in, len(resultado), memoria_depois - memoria_antes)
+    if len(resultado) != rows_in:
+        logger.warning(f"A etapa {func.__name__} alterou o número de linhas: {rows_in} -> {len(resultado)}.")
+    return resultado
+
+
+@contextmanager
+def timed_section(section: str):
+    """Mede o tempo de uma seção do dashboard em cada execução."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.record_section(section, time.perf_counter() - inicio)
+
+
+_ready = threading.Event()
+
+
+def mark_ready() -> None:
+    """Sinaliza que o pré-aquecimento terminou; a partir daí `/ready` responde 200."""
+    if not _ready.is_set():
+        REGISTRY.record_startup('ready', time.time() - PROCESS_START)
+        _ready.set()
+        logger.info(f"Aplicação pronta {time.time() - PROCESS_START:.1f}s após o início do processo.")
+
+
+def record_first_page() -> None:
+    """Registra o tempo entre o início do processo e a primeira página do dashboard renderizada."""
+    REGISTRY.record_startup('first_page', time.time() - PROCESS_START)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/ready':
+            # Sinal de prontidão do Kubernetes: só aceita tráfego depois do pré-aquecimento
+            if not _ready.is_set():
+                self.send_error(503, "Pre-aquecimento em andamento")
+                return
+            corpo, tipo = b'ok', 'text/plain; charset=utf-8'
+        elif self.path == '/metrics':
+            corpo, tipo = REGISTRY.to_prometheus().encode(), 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path == '/profile.json':
+            corpo, tipo = json.dumps(REGISTRY.to_json(), ensure_ascii=False, indent=2).encode(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        # As coletas periódicas do Prometheus não devem poluir o log da aplicação
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT) -> None:
+    """Inicia (uma única vez por processo) o servidor HTTP de /metrics, /profile.json e /ready."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return
+        try:
+            _server = ThreadingHTTPServer(('0.0.0.0', port), _MetricsHandler)
+        except OSError as e:
+            logger.warning(f"Não foi possível iniciar o servidor de métricas na porta {port}: {e}")
+            return
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Métricas disponíveis em :{port}/metrics e :{port}/profile.json")
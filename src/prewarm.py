@@ -0,0 +1,71 @@
+"""
+Inicialização do servidor com pré-aquecimento.
+O Streamlit roda neste mesmo processo; em paralelo, uma thread importa os módulos pesados,
+carrega e processa os dados e constrói os índices derivados. O pod só é marcado como pronto
+(`/ready` na porta de métricas) quando esse pré-aquecimento termina, de modo que o primeiro
+usuário não paga pela carga dos dados.
+
+Uso: python -m src.prewarm [opções do streamlit run]
+"""
+import importlib
+import logging
+import sys
+import threading
+import time
+
+from src.metrics import PROCESS_START, REGISTRY, mark_ready, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+APP_PATH = 'app.py'
+
+# Módulos que o dashboard importa de forma preguiçosa; o pré-aquecimento os carrega antes do primeiro acesso
+HEAVY_MODULES = ['pandas', 'pyarrow', 'plotly.express', 'streamlit_authenticator', 'yaml']
+
+
+def _warm_plotly() -> None:
+    """Monta e serializa uma figura mínima para carregar os templates e validadores do Plotly."""
+    px = importlib.import_module('plotly.express')
+    px.bar(x=[0], y=[0]).to_plotly_json()
+
+
+def prewarm() -> None:
+    """Importa os módulos pesados, carrega os dados com os índices derivados e sinaliza prontidão."""
+    for module in HEAVY_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning(f"Pré-aquecimento: não foi possível importar {module}: {e}")
+    try:
+        _warm_plotly()
+    except Exception as e:
+        logger.warning(f"Pré-aquecimento: falha ao preparar o Plotly: {e}")
+    REGISTRY.record_startup('imports', time.time() - PROCESS_START)
+
+    from src.reload import get_shared_manager
+    registros = len(get_shared_manager().current.df)
+    REGISTRY.record_startup('data', time.time() - PROCESS_START)
+    logger.info(f"Pré-aquecimento concluído: {registros} registros carregados.")
+    mark_ready()
+
+
+def _run_prewarm() -> None:
+    try:
+        prewarm()
+    except Exception:
+        # Sem dados o pod continua fora do balanceamento; o erro fica no log para diagnóstico
+        logger.exception("Falha no pré-aquecimento; a aplicação não será marcada como pronta.")
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO)
+    start_metrics_server()
+    threading.Thread(target=_run_prewarm, name="prewarm", daemon=True).start()
+
+    from streamlit.web import cli as stcli
+    sys.argv = ['streamlit', 'run', APP_PATH, *(sys.argv[1:] if argv is None else argv)]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,105 +1,629 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import date
+import hashlib
+import itertools
 import logging
-from src.constants import MAPA_REGIOES, CARGOS_GERENCIAIS, BAIRROS_RIO, OUTRAS_LOCALIDADES
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Iterator
+from pandas.api.types import union_categoricals
+from src import constants
+from src.constants import MAPA_REGIOES, CARGOS_GERENCIAIS, BAIRRO_PARA_REGIAO_RIO, OUTRAS_LOCALIDADES
+from src.geocoding import GEOCODER_PATH, GEOCODER_VERSION, load_geocoder
+from src.metrics import REGISTRY, MetricsRegistry, profile_stage
+from src.store import publication_lock, read_frame, write_table
 
 logger = logging.getLogger(__name__)
 
+# Incrementar sempre que uma etapa da pipeline mudar o resultado produzido
+PIPELINE_VERSION = "4"
+CACHE_DIR = Path(os.environ.get('DADOSREGIAO_CACHE_DIR', '.cache/processed'))
+CACHE_MAX_ENTRIES = int(os.environ.get('DADOSREGIAO_CACHE_MAX_ENTRIES', 3))
+# Linhas lidas e processadas por bloco; limita a memória intermediária da pipeline
+CHUNK_ROWS = int(os.environ.get('DADOSREGIAO_CHUNK_ROWS', 100_000))
+# Data de referência fixa para o cálculo das idades (AAAA-MM-DD); sem ela, usa a data atual
+REFERENCE_DATE = os.environ.get('DADOSREGIAO_REFERENCE_DATE')
+BIRTH_DATE_FORMAT = '%d/%m/%Y'
+
+DTYPE_SPEC = {
+    'CHAPA': 'str', 'UNIDADE': 'category', 'FUNÇÃO': 'category',
+    'SEXO': 'category', 'BAIRRO': 'str', 'CIDADE': 'str',
+    'ESTADO': 'category', 'CEP': 'str', 'CODSITUACAO': 'category',
+    'PLANO': 'category', 'Status': 'category'
+}
+
+# Representação compacta do DataFrame processado (aplicada por `_compact_frame`)
+CATEGORICAL_COLUMNS = ['BAIRRO', 'CIDADE', 'REGIAO', 'REGIAO_CIDADE', 'TIPO_CARGO']
+STRING_COLUMNS = ['CHAPA']
+COORDINATE_DTYPE = 'float32'
+AGE_DTYPE = 'Int16'
+# Colunas que o dashboard nunca exibe nem consulta (o hash de origem já as inclui)
+DROPPED_COLUMNS = ['CEP']
+
+PADRAO_CARGOS_GERENCIAIS = re.compile('|'.join(re.escape(cargo) for cargo in CARGOS_GERENCIAIS))
+
+def _available_cpus() -> int:
+    """CPUs disponíveis para o processo, respeitando a afinidade e a cota de CPU do cgroup (limite do pod)."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    for arquivo, converter in (
+        ('/sys/fs/cgroup/cpu.max', lambda texto: texto.split()),
+        ('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', lambda texto: [texto.strip(), Path('/sys/fs/cgroup/cpu/cpu.cfs_period_us').read_text().strip()]),
+    ):
+        try:
+            cota, periodo = converter(Path(arquivo).read_text())
+        except (OSError, ValueError):
+            continue
+        if cota not in ('max', '-1'):
+            cpus = min(cpus, max(1, int(int(cota) / int(periodo))))
+        break
+    return cpus
+
+_CPUS = _available_cpus()
+# Processos que executam a pipeline sobre blocos (partições) diferentes do CSV
+WORKERS = int(os.environ.get('DADOSREGIAO_WORKERS', _CPUS))
+# Threads que executam etapas independentes de um mesmo bloco em paralelo
+STAGE_THREADS = int(os.environ.get('DADOSREGIAO_STAGE_THREADS', min(4, _CPUS)))
+
+def _stage(inputs: list[str] | None, outputs: list[str]):
+    """
+    Declara as colunas lidas e escritas por uma etapa da pipeline, usadas pelo agendador
+    para descobrir quais etapas são independentes. `inputs=None` indica que a etapa lê
+    todas as colunas presentes no DataFrame que recebe.
+    """
+    def declarar(func):
+        func.inputs = None if inputs is None else tuple(inputs)
+        func.outputs = tuple(outputs)
+        return func
+    return declarar
+
+@_stage(inputs=None, outputs=['HASH_ORIGEM'])
+def _hash_source_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Registra o hash das colunas originais de cada linha, usado para detectar alterações entre exportações."""
+    df['HASH_ORIGEM'] = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return df
+
+def reference_date() -> date:
+    """Data de referência das idades: `DADOSREGIAO_REFERENCE_DATE`, se definida, ou a data atual."""
+    return date.fromisoformat(REFERENCE_DATE) if REFERENCE_DATE else date.today()
+
+def _date_keys(datas: np.ndarray) -> np.ndarray:
+    """Chave inteira AAAAMMDD de cada data (datetime64[D]); a diferença entre chaves // 10000 é a idade."""
+    anos = datas.astype('datetime64[Y]')
+    meses = datas.astype('datetime64[M]')
+    return ((anos.astype('int64') + 1970) * 10000
+            + (meses - anos).astype('int64') * 100 + 100
+            + (datas - meses).astype('int64') + 1)
+
+def _compute_age(datas_nascimento: pd.Series, reference: date | None = None) -> pd.Series:
+    """
+    Idade em anos completos na data de referência, a partir de ano, mês e dia (exata inclusive
+    na véspera e no dia do aniversário). Datas ausentes resultam em idade ausente.
+    """
+    dias = datas_nascimento.to_numpy(dtype='datetime64[D]')
+    ausentes = np.isnat(dias)
+    dias = dias.view('int64')
+    idades = np.zeros(len(dias), dtype=AGE_DTYPE.lower())
+    if not ausentes.all():
+        # A idade é calculada uma vez por dia do intervalo das datas e distribuída por indexação
+        inicio, fim = dias[~ausentes].min(), dias[~ausentes].max()
+        referencia = _date_keys(np.array([reference or reference_date()], dtype='datetime64[D]'))[0]
+        por_dia = (referencia - _date_keys(np.arange(inicio, fim + 1).astype('datetime64[D]'))) // 10000
+        idades[~ausentes] = por_dia[dias[~ausentes] - inicio]
+    return pd.Series(pd.arrays.IntegerArray(idades, ausentes), index=datas_nascimento.index, name='IDADE')
+
+def _parse_birth_dates(valores: pd.Series) -> pd.Series:
+    """Interpreta as datas de nascimento uma única vez por valor distinto (elas se repetem muito)."""
+    codigos, distintos = pd.factorize(valores)
+    datas = pd.to_datetime(pd.Series(np.asarray(distintos, dtype=object)), format=BIRTH_DATE_FORMAT, errors='coerce')
+    # A posição extra ao final corresponde ao código -1 (valor ausente)
+    datas = datas.to_numpy()
+    datas = np.append(datas, np.array(['NaT'], dtype=datas.dtype))
+    return pd.Series(datas[codigos], index=valores.index, name=valores.name)
+
+@_stage(inputs=['DT_NASCIMENTO'], outputs=['DT_NASCIMENTO', 'IDADE'])
 def _calculate_age(df: pd.DataFrame) -> pd.DataFrame:
     """Calcula a idade dos colaboradores com base na data de nascimento."""
-    df['DT_NASCIMENTO'] = pd.to_datetime(df['DT_NASCIMENTO'], format='%d/%m/%Y', errors='coerce')
-    age_in_years = (datetime.now() - df['DT_NASCIMENTO']).dt.days / 365.25
-    df['IDADE'] = np.floor(age_in_years).astype('Int64')
+    df['DT_NASCIMENTO'] = _parse_birth_dates(df['DT_NASCIMENTO'])
+    df['IDADE'] = _compute_age(df['DT_NASCIMENTO'])
     return df
 
+def refresh_ages(df: pd.DataFrame, reference: date | None = None) -> pd.DataFrame:
+    """
+    Recalcula somente a coluna IDADE de um DataFrame já processado para a data de referência,
+    a partir das datas já interpretadas, sem reler o CSV nem executar as demais etapas.
+    Returns:
+        pd.DataFrame: Cópia rasa do DataFrame com a nova coluna IDADE (as demais são compartilhadas).
+    """
+    df = df.copy(deep=False)
+    df['IDADE'] = _compute_age(df['DT_NASCIMENTO'], reference)
+    return df
+
+@_stage(inputs=['ESTADO'], outputs=['REGIAO'])
 def _map_brazilian_regions(df: pd.DataFrame) -> pd.DataFrame:
     """Mapeia o estado para a região geográfica correspondente."""
     df['REGIAO'] = df['ESTADO'].map(MAPA_REGIOES)
     return df
 
+@_stage(inputs=['FUNÇÃO'], outputs=['TIPO_CARGO'])
 def _classify_job_type(df: pd.DataFrame) -> pd.DataFrame:
-    """Classifica os cargos em 'Gerencial' ou 'Operacional'."""
-    df['TIPO_CARGO'] = df['FUNÇÃO'].apply(
-        lambda x: 'Gerencial' if any(cargo in str(x).upper() for cargo in CARGOS_GERENCIAIS) else 'Operacional'
-    )
+    """Classifica os cargos em 'Gerencial' ou 'Operacional' (uma vez por FUNÇÃO distinta)."""
+    codigos, funcoes = pd.factorize(df['FUNÇÃO'])
+    # Acrescenta um valor ausente ao final para que o código -1 (NaN) seja classificado junto
+    funcoes = pd.Series(np.append(np.asarray(funcoes, dtype=object), np.nan), dtype=object)
+    gerencial = funcoes.astype(str).str.upper().str.contains(PADRAO_CARGOS_GERENCIAIS).to_numpy(dtype=bool)
+    tipos = np.where(gerencial, 'Gerencial', 'Operacional').astype(object)
+    df['TIPO_CARGO'] = pd.Series(tipos[codigos], index=df.index, dtype=object)
     return df
 
+@_stage(inputs=['CIDADE', 'ESTADO', 'CHAPA'], outputs=['latitude', 'longitude'])
 def _merge_geo_coordinates(df: pd.DataFrame) -> pd.DataFrame:
-    """Busca e adiciona coordenadas geográficas com base na cidade."""
+    """Adiciona coordenadas geográficas por (cidade, UF) usando a tabela local de municípios."""
     try:
-        logger.info("Buscando coordenadas geográficas de municípios...")
-        df_municipios = pd.read_csv("https://raw.githubusercontent.com/kelvins/Municipios-Brasileiros/main/csv/municipios.csv")
-        df_municipios = df_municipios.rename(columns={'nome': 'CIDADE', 'uf': 'ESTADO'})
-        df = pd.merge(df, df_municipios[['CIDADE', 'latitude', 'longitude']], on='CIDADE', how='left')
-        logger.info("Coordenadas geográficas mescladas com sucesso.")
+        geocoder = load_geocoder()
+        df['latitude'], df['longitude'] = geocoder.coordinates(df['CIDADE'], df['ESTADO'])
+        logger.info(f"Coordenadas geográficas encontradas para {df['latitude'].notna().sum()} de {len(df)} registros.")
     except Exception as e:
-        logger.error(f"Falha ao buscar ou mesclar coordenadas geográficas: {e}")
+        logger.error(f"Falha ao carregar a tabela de geocodificação: {e}")
         # Cria colunas vazias para que o resto do app não falhe
         df['latitude'] = np.nan
         df['longitude'] = np.nan
 
     # Adiciona ruído apenas às coordenadas válidas para evitar sobreposição
     valid_coords_mask = df['latitude'].notna() & df['longitude'].notna()
-    
-    np.random.seed(0)
-    noise_lat = np.random.normal(0, 0.01, size=valid_coords_mask.sum())
-    noise_lon = np.random.normal(0, 0.01, size=valid_coords_mask.sum())
+    noise_lat, noise_lon = _coordinate_noise(df.loc[valid_coords_mask, 'CHAPA'])
     df.loc[valid_coords_mask, 'latitude'] += noise_lat
     df.loc[valid_coords_mask, 'longitude'] += noise_lon
     return df
 
+def _coordinate_noise(chaves: pd.Series, scale: float = 0.01) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ruído gaussiano determinístico por colaborador (derivado do hash da CHAPA), para que o
+    resultado não dependa da divisão do arquivo em blocos nem da ordem das linhas.
+    """
+    h1 = pd.util.hash_pandas_object(chaves, index=False).to_numpy()
+    h2 = pd.util.hash_pandas_object(chaves, index=False, hash_key='dadosregiao-lon1').to_numpy()
+    # Transformação de Box-Muller sobre dois uniformes em (0, 1) extraídos dos 53 bits mais altos
+    u1 = ((h1 >> np.uint64(11)).astype('float64') + 0.5) / 2.0**53
+    u2 = ((h2 >> np.uint64(11)).astype('float64') + 0.5) / 2.0**53
+    raio = scale * np.sqrt(-2.0 * np.log(u1))
+    return raio * np.cos(2 * np.pi * u2), raio * np.sin(2 * np.pi * u2)
+
+@_stage(inputs=['BAIRRO', 'CIDADE'], outputs=['REGIAO_CIDADE'])
 def _classify_special_locations(df: pd.DataFrame) -> pd.DataFrame:
-    """Agrupa bairros do Rio e outras localidades específicas."""
-    def classificar(row):
-        bairro = str(row['BAIRRO']).upper().strip()
-        if row['CIDADE'] == 'Rio de Janeiro':
-            for regiao, bairros_na_regiao in BAIRROS_RIO.items():
-                if bairro in bairros_na_regiao:
-                    return regiao
-            return 'Rio_Outra'
-        return OUTRAS_LOCALIDADES.get(bairro, row['CIDADE'])
-
-    df['REGIAO_CIDADE'] = df.apply(classificar, axis=1)
+    """Agrupa bairros do Rio e outras localidades específicas (uma vez por par bairro/cidade distinto)."""
+    codigos_bairro, bairros = pd.factorize(df['BAIRRO'])
+    codigos_cidade, cidades = pd.factorize(df['CIDADE'])
+    n_cidades = len(cidades) + 1
+    codigos_pares, pares = pd.factorize((codigos_bairro + 1) * n_cidades + (codigos_cidade + 1))
+
+    # A posição 0 das tabelas abaixo representa o valor ausente (código -1 + 1)
+    bairros = pd.Series(np.append(np.nan, np.asarray(bairros, dtype=object)), dtype=object)
+    bairros = bairros.astype(str).str.upper().str.strip().to_numpy()
+    cidades = np.append(np.nan, np.asarray(cidades, dtype=object))
+    bairros_pares = pd.Series(bairros[pares // n_cidades], dtype=object)
+    cidades_pares = pd.Series(cidades[pares % n_cidades], dtype=object)
+
+    regiao_rio = bairros_pares.map(BAIRRO_PARA_REGIAO_RIO).fillna('Rio_Outra')
+    outras = bairros_pares.map(OUTRAS_LOCALIDADES).fillna(cidades_pares)
+    classificacao = regiao_rio.where(cidades_pares == 'Rio de Janeiro', outras).to_numpy(dtype=object)
+
+    df['REGIAO_CIDADE'] = pd.Series(classificacao[codigos_pares], index=df.index, dtype=object)
     return df
 
-def load_and_process_data(csv_path: str) -> pd.DataFrame:
+PIPELINE = [
+    _hash_source_rows,
+    _calculate_age,
+    _map_brazilian_regions,
+    _classify_job_type,
+    _merge_geo_coordinates,
+    _classify_special_locations
+]
+
+def _memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2**20
+
+def _compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte o resultado da pipeline para uma representação compacta: colunas de baixa
+    cardinalidade viram categóricas, textos usam strings do Arrow, coordenadas ficam em
+    float32, a idade em um inteiro pequeno e colunas que o dashboard não usa são removidas.
+    """
+    antes = _memory_mb(df)
+    df = df.drop(columns=[column for column in DROPPED_COLUMNS if column in df.columns])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column in STRING_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(pd.StringDtype('pyarrow'))
+    for column in ('latitude', 'longitude'):
+        if column in df.columns:
+            df[column] = df[column].astype(COORDINATE_DTYPE)
+    if 'IDADE' in df.columns:
+        df['IDADE'] = df['IDADE'].astype(AGE_DTYPE)
+    logger.info(f"Memória do bloco compactada de {antes:.1f} MB para {_memory_mb(df):.1f} MB ({len(df)} registros).")
+    return df
+
+def _process_chunk(chunk: pd.DataFrame, threads: int = STAGE_THREADS, registry: MetricsRegistry = REGISTRY) -> pd.DataFrame:
+    """Executa a pipeline em um bloco e compacta o resultado."""
+    return profile_stage(_compact_frame, run_stages(chunk, threads=threads, registry=registry), registry)
+
+def _read_chunks(csv_path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Lê o CSV em blocos de até `chunk_rows` linhas."""
+    with pd.read_csv(
+        csv_path, sep=';', encoding='utf-8-sig', on_bad_lines='warn', dtype=DTYPE_SPEC, chunksize=chunk_rows
+    ) as reader:
+        yield from reader
+
+def _apply_stage(chunks: Iterator[pd.DataFrame], func: Callable[[pd.DataFrame], pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Etapa da pipeline como gerador: processa (e instrumenta) um bloco por vez."""
+    for chunk in chunks:
+        yield profile_stage(func, chunk)
+
+def _depends_on(anterior: Callable, etapa: Callable, columns: list[str]) -> bool:
+    """Se `etapa` precisa esperar `anterior` (que vem antes na pipeline) por compartilharem colunas."""
+    leituras_anterior = set(columns if anterior.inputs is None else anterior.inputs)
+    leituras_etapa = set(columns if etapa.inputs is None else etapa.inputs)
+    escritas_anterior, escritas_etapa = set(anterior.outputs), set(etapa.outputs)
+    return bool(escritas_anterior & (leituras_etapa | escritas_etapa) or leituras_anterior & escritas_etapa)
+
+def _stage_dependencies(stages: list[Callable], columns: list[str]) -> dict[int, set[int]]:
+    """Grafo de dependências (DAG) entre as etapas, na ordem declarada em `stages`."""
+    dependencias = {}
+    colunas = list(columns)
+    for j, etapa in enumerate(stages):
+        dependencias[j] = {i for i in range(j) if _depends_on(stages[i], etapa, colunas)}
+        colunas += [column for column in etapa.outputs if column not in colunas]
+    return dependencias
+
+def run_stages(df: pd.DataFrame, stages: list[Callable] = PIPELINE, threads: int = STAGE_THREADS,
+               registry: MetricsRegistry = REGISTRY) -> pd.DataFrame:
+    """
+    Executa as etapas sobre um DataFrame respeitando as dependências declaradas em `_stage`.
+    Etapas independentes rodam em paralelo em um pool de threads, cada uma sobre a projeção
+    das colunas que lê; as colunas escritas são incorporadas ao DataFrame quando a etapa
+    termina, liberando as que dependem dela. O resultado (inclusive a ordem das colunas)
+    é o mesmo da execução sequencial.
+    """
+    if threads <= 1 or len(stages) <= 1:
+        for func in stages:
+            df = profile_stage(func, df, registry)
+        return df
+
+    ordem_colunas = list(df.columns)
+    for func in stages:
+        ordem_colunas += [column for column in func.outputs if column not in ordem_colunas]
+    dependencias = _stage_dependencies(stages, df.columns)
+    pendentes = set(dependencias)
+    em_execucao = {}
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="pipeline-stage") as pool:
+        while pendentes or em_execucao:
+            concluidas = set(dependencias) - pendentes - set(em_execucao.values())
+            for j in sorted(pendentes):
+                if dependencias[j] <= concluidas:
+                    func = stages[j]
+                    # A projeção é uma cópia rasa ou preguiçosa (copy-on-write); a etapa nunca altera `df`
+                    entrada = df.copy(deep=False) if func.inputs is None else df[list(func.inputs)]
+                    em_execucao[pool.submit(profile_stage, func, entrada, registry)] = j
+                    pendentes.discard(j)
+            prontas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in prontas:
+                func = stages[em_execucao.pop(futuro)]
+                resultado = futuro.result()
+                for column in func.outputs:
+                    df[column] = resultado[column]
+    return df[ordem_colunas]
+
+def _process_partition(chunk: pd.DataFrame, threads: int) -> tuple[pd.DataFrame, dict]:
+    """Executa a pipeline em um bloco dentro de um processo de trabalho e devolve as métricas das etapas."""
+    registry = MetricsRegistry()
+    chunk = _process_chunk(chunk, threads=threads, registry=registry)
+    return chunk, registry.to_json()['pipeline']['stages_total']
+
+def _process_chunks(chunks: Iterator[pd.DataFrame], workers: int) -> Iterator[pd.DataFrame]:
+    """
+    Executa a pipeline bloco a bloco. Com mais de um bloco e `workers > 1`, os blocos são
+    distribuídos entre processos (cada bloco é uma partição independente); no máximo
+    `2 * workers` blocos ficam em trânsito, e a ordem do arquivo é preservada.
+    """
+    primeiro = next(chunks, None)
+    segundo = next(chunks, None)
+    if primeiro is None:
+        return
+    if segundo is None or workers <= 1:
+        for chunk in itertools.chain([primeiro] if segundo is None else [primeiro, segundo], chunks):
+            yield _process_chunk(chunk)
+        return
+
+    logger.info(f"Processando blocos em {workers} processos.")
+    threads = max(1, STAGE_THREADS // workers)
+    # 'spawn' evita herdar as threads do Streamlit e do monitor de dados em um fork
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        em_transito = deque()
+        for chunk in itertools.chain([primeiro, segundo], chunks):
+            em_transito.append(pool.submit(_process_partition, chunk, threads))
+            if len(em_transito) >= 2 * workers:
+                yield _collect_partition(em_transito.popleft())
+        while em_transito:
+            yield _collect_partition(em_transito.popleft())
+
+def _collect_partition(futuro) -> pd.DataFrame:
+    """Aguarda um bloco processado em outro processo e registra as métricas das suas etapas."""
+    chunk, etapas = futuro.result()
+    REGISTRY.merge_stages(etapas)
+    return chunk
+
+def _assemble_chunks(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    """Monta o DataFrame final uma única vez, unificando as categorias de cada bloco."""
+    blocos = list(chunks)
+    if not blocos:
+        return pd.DataFrame()
+    # Blocos vazios não acrescentam linhas e suas categorias podem ter outro tipo
+    blocos = [bloco for bloco in blocos if not bloco.empty] or blocos[:1]
+    if len(blocos) == 1:
+        return blocos[0]
+
+    categoricas = [
+        column for column in blocos[0].columns
+        if all(isinstance(bloco[column].dtype, pd.CategoricalDtype) for bloco in blocos)
+    ]
+    for column in categoricas:
+        unificada = union_categoricals([bloco[column] for bloco in blocos], sort_categories=True)
+        for bloco in blocos:
+            bloco[column] = pd.Categorical(bloco[column], categories=unificada.categories)
+
+    df = pd.concat(blocos, ignore_index=True)
+    blocos.clear()
+    return df
+
+def load_and_process_data(csv_path: str, chunk_rows: int = CHUNK_ROWS, workers: int = WORKERS) -> pd.DataFrame:
     """
     Carrega e processa todos os dados em uma pipeline completa.
+    O CSV é lido em blocos e cada etapa roda bloco a bloco, de modo que a memória
+    intermediária fica limitada ao tamanho do bloco; o DataFrame final é montado uma única vez.
+    Os blocos são processados em paralelo por até `workers` processos e, dentro de cada bloco,
+    etapas independentes rodam em paralelo (`run_stages`).
     Args:
         csv_path (str): O caminho para o arquivo CSV de dados.
+        chunk_rows (int): Número máximo de linhas por bloco.
+        workers (int): Número de processos para os blocos (1 processa tudo no processo atual).
     Returns:
         pd.DataFrame: O DataFrame processado e pronto para análise.
     """
-    logger.info(f"Iniciando pipeline de processamento para {csv_path}")
-    
-    dtype_spec = {
-        'CHAPA': 'str', 'UNIDADE': 'category', 'FUNÇÃO': 'category',
-        'SEXO': 'category', 'BAIRRO': 'str', 'CIDADE': 'str',
-        'ESTADO': 'category', 'CEP': 'str', 'CODSITUACAO': 'category',
-        'PLANO': 'category', 'Status': 'category'
-    }
-    
+    logger.info(f"Iniciando pipeline de processamento para {csv_path} (blocos de {chunk_rows} linhas)")
+    inicio = time.perf_counter()
+
     try:
-        df = pd.read_csv(
-            csv_path, sep=';', encoding='utf-8-sig', on_bad_lines='warn', dtype=dtype_spec
-        )
-        
-        pipeline = [
-            _calculate_age,
-            _map_brazilian_regions,
-            _classify_job_type,
-            _merge_geo_coordinates,
-            _classify_special_locations
-        ]
-        
-        for func in pipeline:
-            logger.info(f"Executando etapa: {func.__name__}")
-            df = func(df)
-            
-        logger.info("Pipeline de processamento concluída com sucesso.")
+        df = _assemble_chunks(_process_chunks(_read_chunks(csv_path, chunk_rows), workers))
+        REGISTRY.record_run(time.perf_counter() - inicio, len(df))
+        logger.info(f"Pipeline de processamento concluída com sucesso em {time.perf_counter() - inicio:.2f}s.")
         return df
     except FileNotFoundError:
         logger.error(f"Erro crítico: Arquivo de dados não encontrado em '{csv_path}'.")
         # Retorna um DataFrame vazio para evitar que a aplicação quebre
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
+
+def _pipeline_inputs_hash() -> str:
+    """
+    Hash das entradas da pipeline além do CSV: tabelas de constantes, tabela de geocodificação
+    e versões. Linhas processadas com entradas diferentes não podem ser reaproveitadas.
+    """
+    digest = hashlib.sha256()
+    tabelas = {
+        'MAPA_REGIOES': constants.MAPA_REGIOES,
+        'CARGOS_GERENCIAIS': constants.CARGOS_GERENCIAIS,
+        'BAIRROS_RIO': {regiao: sorted(bairros) for regiao, bairros in constants.BAIRROS_RIO.items()},
+        'OUTRAS_LOCALIDADES': constants.OUTRAS_LOCALIDADES,
+    }
+    digest.update(repr(sorted(tabelas.items())).encode())
+    digest.update(f"pipeline={PIPELINE_VERSION};geocoder={GEOCODER_VERSION}".encode())
+    if GEOCODER_PATH.exists():
+        digest.update(GEOCODER_PATH.read_bytes())
+    return digest.hexdigest()[:32]
+
+def _dataset_fingerprint(csv_path: str) -> str:
+    """
+    Calcula a chave do cache a partir do conteúdo do CSV e das demais entradas da pipeline
+    (`_pipeline_inputs_hash`).
+    """
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            digest.update(bloco)
+    digest.update(_pipeline_inputs_hash().encode())
+    return digest.hexdigest()[:32]
+
+def _evict_cache_entries(cache_dir: Path, max_entries: int) -> None:
+    """Remove as entradas mais antigas do cache, mantendo as `max_entries` usadas mais recentemente."""
+    entradas = sorted(cache_dir.glob('*.arrow'), key=lambda p: p.stat().st_mtime, reverse=True)
+    for entrada in entradas[max_entries:]:
+        try:
+            # Processos que ainda mapeiam o arquivo continuam lendo-o até liberá-lo
+            entrada.unlink()
+            entrada.with_suffix('.lock').unlink(missing_ok=True)
+            logger.info(f"Entrada antiga do cache removida: {entrada.name}")
+        except OSError as e:
+            logger.warning(f"Não foi possível remover a entrada de cache {entrada}: {e}")
+
+def _write_snapshot(df: pd.DataFrame, path: Path) -> None:
+    """
+    Publica o DataFrame processado no armazenamento compartilhado, registrando a versão da
+    pipeline e o hash das demais entradas (constantes e geocodificação).
+    """
+    write_table(df, path, {'pipeline_version': PIPELINE_VERSION, 'inputs_hash': _pipeline_inputs_hash()})
+
+def _read_snapshot(path: Path) -> pd.DataFrame:
+    """
+    Lê (mapeando em memória, sem cópia) um DataFrame processado gravado por `_write_snapshot`.
+    Snapshots de outra versão da pipeline ou com outras constantes/geocodificação são rejeitados,
+    pois suas colunas derivadas não valem para as entradas atuais.
+    """
+    df, metadata = read_frame(path)
+    versao = metadata.get('pipeline_version', '')
+    if versao != PIPELINE_VERSION:
+        raise ValueError(f"Snapshot gerado pela pipeline versão '{versao}' (atual '{PIPELINE_VERSION}').")
+    if metadata.get('inputs_hash', '') != _pipeline_inputs_hash():
+        raise ValueError("Snapshot gerado com outras tabelas de constantes ou de geocodificação.")
+    # A idade depende da data de referência e é recalculada a partir da data já interpretada
+    return refresh_ages(df)
+
+def _row_keys(df: pd.DataFrame) -> pd.MultiIndex:
+    """Chave de cada linha: CHAPA e o número da ocorrência (para CHAPAs repetidas no arquivo)."""
+    ocorrencias = df.groupby('CHAPA', sort=False, dropna=False).cumcount()
+    return pd.MultiIndex.from_arrays([df['CHAPA'].astype(object).to_numpy(), ocorrencias.to_numpy()])
+
+@dataclass
+class DatasetDelta:
+    """Resumo de uma atualização incremental e as linhas processadas que saíram e entraram."""
+    inserted: int
+    changed: int
+    removed: int
+    removed_rows: pd.DataFrame
+    added_rows: pd.DataFrame
+    # Chave de cache da versão usada como base (preenchida por `load_cached_dataset`)
+    base: str | None = None
+
+def update_processed_data(csv_path: str, previous: pd.DataFrame,
+                          chunk_rows: int = CHUNK_ROWS) -> tuple[pd.DataFrame, DatasetDelta]:
+    """
+    Atualiza um DataFrame já processado a partir de uma nova exportação do CSV.
+    As linhas são casadas pela CHAPA; apenas as inseridas ou alteradas (hash das colunas
+    originais diferente) passam pela pipeline, as removidas são descartadas e as demais são
+    reaproveitadas do processamento anterior.
+    Args:
+        csv_path (str): O caminho para a nova exportação do CSV.
+        previous (pd.DataFrame): Resultado anterior de `load_and_process_data`.
+        chunk_rows (int): Número máximo de linhas por bloco.
+    Returns:
+        tuple[pd.DataFrame, DatasetDelta]: O novo DataFrame processado, na ordem do novo
+        arquivo, e o delta aplicado (para atualizar pré-agregações como o cubo).
+    """
+    if 'HASH_ORIGEM' not in previous.columns or previous.empty:
+        raise ValueError("O DataFrame anterior não possui hashes de origem para comparação.")
+    logger.info(f"Iniciando atualização incremental a partir de {csv_path}")
+    inicio = time.perf_counter()
+    raw = _assemble_chunks(_apply_stage(_read_chunks(csv_path, chunk_rows), _hash_source_rows))
+
+    posicoes_anteriores = _row_keys(previous).get_indexer(_row_keys(raw))
+    hashes_anteriores = previous['HASH_ORIGEM'].to_numpy()[posicoes_anteriores]
+    inseridas = posicoes_anteriores < 0
+    reprocessar = inseridas | (hashes_anteriores != raw['HASH_ORIGEM'].to_numpy())
+
+    mantidas = posicoes_anteriores[~reprocessar]
+    descartadas = np.ones(len(previous), dtype=bool)
+    descartadas[mantidas] = False
+
+    if reprocessar.any():
+        novas = profile_stage(_compact_frame, run_stages(raw[reprocessar].copy(), PIPELINE[1:]))
+    else:
+        # Exportação apenas com remoções: nada passa pela pipeline
+        novas = previous.iloc[:0]
+
+    delta = DatasetDelta(
+        inserted=int(inseridas.sum()),
+        changed=int((reprocessar & ~inseridas).sum()),
+        removed=int(descartadas.sum() - (reprocessar & ~inseridas).sum()),
+        removed_rows=previous[descartadas],
+        added_rows=novas,
+    )
+    logger.info(f"Delta: {delta.inserted} inseridas, {delta.changed} alteradas, {delta.removed} removidas "
+                f"({len(raw) - len(novas)} reaproveitadas).")
+
+    if novas.empty:
+        # As linhas mantidas já estão na ordem do novo arquivo
+        df = previous.iloc[mantidas].reset_index(drop=True)
+    else:
+        # Reúne as linhas reaproveitadas e as reprocessadas e restaura a ordem do novo arquivo
+        df = _assemble_chunks(iter([previous.iloc[mantidas], novas]))
+        ordem = np.concatenate([np.flatnonzero(~reprocessar), np.flatnonzero(reprocessar)])
+        df = df.iloc[np.argsort(ordem, kind='stable')].reset_index(drop=True)
+    REGISTRY.record_run(time.perf_counter() - inicio, len(df))
+    return df, delta
+
+def _latest_snapshot(cache_dir: Path) -> Path | None:
+    """Entrada de cache usada mais recentemente, base para a atualização incremental."""
+    entradas = sorted(Path(cache_dir).glob('*.arrow'), key=lambda p: p.stat().st_mtime, reverse=True)
+    return entradas[0] if entradas else None
+
+def _read_cache_entry(cache_path: Path) -> pd.DataFrame | None:
+    """Lê uma entrada do cache, se existir e for válida, marcando-a como usada recentemente."""
+    if not cache_path.exists():
+        return None
+    try:
+        df = _read_snapshot(cache_path)
+        os.utime(cache_path)
+        logger.info(f"Dados processados carregados do cache: {cache_path}")
+        return df
+    except Exception as e:
+        logger.warning(f"Entrada de cache inválida em {cache_path}, reprocessando: {e}")
+        return None
+
+def load_cached_dataset(csv_path: str, cache_dir: Path = CACHE_DIR,
+                        max_entries: int = CACHE_MAX_ENTRIES) -> tuple[pd.DataFrame, str | None, DatasetDelta | None]:
+    """
+    Carrega o DataFrame processado do cache em disco (Arrow IPC mapeado em memória).
+    Se o CSV mudou, atualiza incrementalmente a entrada mais recente do cache (ou executa
+    a pipeline completa, se não houver uma) e grava o resultado para os próximos inícios.
+    O diretório funciona como armazenamento compartilhado: cada versão é processada por um
+    único processo e todos os demais (sessões, processos e réplicas no mesmo nó) a leem sem cópia.
+    Args:
+        csv_path (str): O caminho para o arquivo CSV de dados.
+        cache_dir (Path): Diretório das entradas de cache.
+        max_entries (int): Número máximo de versões mantidas em disco.
+    Returns:
+        tuple[pd.DataFrame, str | None, DatasetDelta | None]: O DataFrame processado, a chave
+        da versão no cache (None se o CSV não existe) e, quando este processo fez a atualização
+        incremental, o delta em relação à versão base (`DatasetDelta.base`), para atualizar
+        pré-agregações no lugar.
+    """
+    try:
+        fingerprint = _dataset_fingerprint(csv_path)
+    except FileNotFoundError:
+        return load_and_process_data(csv_path), None, None
+
+    cache_path = Path(cache_dir) / f"{fingerprint}.arrow"
+    df = _read_cache_entry(cache_path)
+    if df is not None:
+        return df, fingerprint, None
+
+    # Apenas um processo (ou réplica no mesmo nó) processa cada versão; os demais aguardam e a leem
+    delta = None
+    with publication_lock(cache_path):
+        df = _read_cache_entry(cache_path)
+        if df is not None:
+            return df, fingerprint, None
+
+        anterior = _latest_snapshot(cache_dir) if Path(cache_dir).exists() else None
+        if anterior is not None and anterior != cache_path:
+            try:
+                df, delta = update_processed_data(csv_path, _read_snapshot(anterior))
+                delta = replace(delta, base=anterior.stem)
+            except Exception as e:
+                logger.warning(f"Atualização incremental a partir de {anterior} indisponível, reprocessando tudo: {e}")
+        if df is None:
+            df = load_and_process_data(csv_path)
+        if df.empty:
+            return df, fingerprint, None
+        try:
+            _write_snapshot(df, cache_path)
+            logger.info(f"Dados processados gravados no cache: {cache_path}")
+            _evict_cache_entries(cache_path.parent, max_entries)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o cache de dados processados: {e}")
+            return df, fingerprint, delta
+
+    # Troca a cópia privada recém-processada pela versão publicada, compartilhada entre os processos
+    publicado = _read_cache_entry(cache_path)
+    return (publicado if publicado is not None else df), fingerprint, delta
+
+def load_cached_data(csv_path: str, cache_dir: Path = CACHE_DIR, max_entries: int = CACHE_MAX_ENTRIES) -> pd.DataFrame:
+    """Carrega o DataFrame processado pelo cache em disco (ver `load_cached_dataset`)."""
+    return load_cached_dataset(csv_path, cache_dir, max_entries)[0]
@@ -0,0 +1,207 @@
+import gc
+import logging
+import os
+import threading
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+
+import pandas as pd
+
+from src.cube import EmployeeCube, build_cube
+from src.filters import BitmapFilterIndex
+from src.processing import load_cached_dataset, reference_date, refresh_ages
+from src.spatial import SpatialGridIndex
+from src.table import PaginatedTable
+
+logger = logging.getLogger(__name__)
+
+# Caminho do CSV; pode apontar para um volume montado no pod para atualizar os dados sem novo deploy
+DATA_PATH = os.environ.get('DADOSREGIAO_DATA_PATH', 'data/dadosregiao.csv')
+POLL_SECONDS = float(os.environ.get('DADOSREGIAO_POLL_SECONDS', 60))
+
+
+@dataclass(frozen=True)
+class DatasetVersion:
+    """Uma versão carregada dos dados com todas as estruturas derivadas usadas pelo dashboard."""
+    stamp: tuple
+    loaded_at: datetime
+    reference_date: date
+    cache_key: str | None
+    df: pd.DataFrame
+    cube: EmployeeCube
+    filter_index: BitmapFilterIndex
+    spatial_index: SpatialGridIndex
+    table_view: PaginatedTable
+
+
+def _file_stamp(csv_path: str) -> tuple:
+    """Identifica a versão do arquivo por data de modificação e tamanho (ou None se ausente)."""
+    try:
+        stat = os.stat(csv_path)
+    except FileNotFoundError:
+        return (None, None)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def build_dataset_version(csv_path: str, previous: DatasetVersion | None = None) -> DatasetVersion:
+    """
+    Carrega o CSV (usando o cache em disco) e constrói os índices derivados.
+    Se a carga foi uma atualização incremental sobre `previous`, o cubo é atualizado a partir
+    do delta (custo proporcional às linhas alteradas) em vez de reconstruído. As idades da versão
+    correspondem sempre à data de referência lida antes da carga.
+    """
+    stamp = _file_stamp(csv_path)
+    reference = reference_date()
+    df, cache_key, delta = load_cached_dataset(csv_path)
+    if reference_date() != reference:
+        # A carga atravessou a meia-noite: parte das idades pode ter sido calculada em outra data
+        df = refresh_ages(df, reference)
+        delta = None
+    cube = None
+    # O delta só vale sobre a mesma versão base e com as idades calculadas na mesma data
+    if (previous is not None and delta is not None and delta.base == previous.cache_key
+            and previous.reference_date == reference):
+        cube = previous.cube.copy()
+        cube.apply_delta(delta.removed_rows, delta.added_rows)
+    return _derive_version(stamp, df, reference, cache_key, cube)
+
+
+def _derive_version(stamp: tuple, df: pd.DataFrame, reference: date, cache_key: str | None,
+                    cube: EmployeeCube | None = None) -> DatasetVersion:
+    """Constrói os índices derivados de um DataFrame processado, com idades na data de referência."""
+    return DatasetVersion(
+        stamp=stamp,
+        loaded_at=datetime.now(),
+        reference_date=reference,
+        cache_key=cache_key,
+        df=df,
+        cube=build_cube(df) if cube is None else cube,
+        filter_index=BitmapFilterIndex(df),
+        spatial_index=SpatialGridIndex.from_frame(df),
+        table_view=PaginatedTable(df),
+    )
+
+
+class DatasetManager:
+    """
+    Mantém a versão atual dos dados e a substitui quando o CSV muda.
+    Uma thread em segundo plano verifica o arquivo periodicamente; ao detectar uma nova versão
+    (estável por duas verificações seguidas, para não ler um arquivo ainda em cópia), constrói a
+    nova versão enquanto as sessões continuam usando a anterior e então troca a referência de
+    forma atômica. A versão antiga é liberada assim que nenhuma execução em andamento a utiliza.
+    """
+
+    def __init__(self, csv_path: str = DATA_PATH, poll_seconds: float = POLL_SECONDS):
+        self.csv_path = csv_path
+        self.poll_seconds = poll_seconds
+        self._current = build_dataset_version(csv_path)
+        self._pending_stamp = None
+        # Versão do arquivo que resultou em dados vazios; só é lida de novo quando o arquivo mudar
+        self._rejected_stamp = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def current(self) -> DatasetVersion:
+        """Versão atual; cada execução do dashboard deve ler esta propriedade uma única vez."""
+        return self._current
+
+    def start(self) -> "DatasetManager":
+        """Inicia a verificação periódica do arquivo em uma thread daemon."""
+        if self._thread is None and self.poll_seconds > 0:
+            self._thread = threading.Thread(target=self._watch, name="dataset-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"Monitorando {self.csv_path} a cada {self.poll_seconds:g}s.")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                if not self.check_for_update():
+                    self.refresh_ages()
+            except Exception as e:
+                logger.error(f"Falha ao recarregar os dados; mantendo a versão atual: {e}")
+
+    def check_for_update(self) -> bool:
+        """Recarrega os dados se o arquivo mudou e está estável. Retorna True se houve troca."""
+        stamp = _file_stamp(self.csv_path)
+        if stamp == self._current.stamp or stamp == self._rejected_stamp or stamp[0] is None:
+            self._pending_stamp = None
+            return False
+        if stamp != self._pending_stamp:
+            # Aguarda a próxima verificação para garantir que a cópia do arquivo terminou
+            self._pending_stamp = stamp
+            return False
+        return self.reload()
+
+    def refresh_ages(self) -> bool:
+        """
+        Na virada do dia, recalcula as idades da versão atual sem reler o CSV nem reprocessar as
+        demais colunas. Só as estruturas que dependem da idade mudam: o cubo é atualizado pelo
+        delta dos colaboradores que fizeram aniversário, o índice de filtros refaz apenas a ordem
+        das idades, a tabela descarta só os índices da coluna IDADE e a grade do mapa é reaproveitada
+        com o cache de agregações vazio.
+        Retorna True se houve troca.
+        """
+        hoje = reference_date()
+        if hoje == self._current.reference_date:
+            return False
+        with self._reload_lock:
+            atual = self._current
+            df = refresh_ages(atual.df, hoje)
+            alteradas = (df['IDADE'] != atual.df['IDADE']).to_numpy(dtype=bool, na_value=False)
+            cube = atual.cube.copy()
+            cube.apply_delta(atual.df[alteradas], df[alteradas])
+            self._current = replace(
+                atual,
+                loaded_at=datetime.now(),
+                reference_date=hoje,
+                df=df,
+                cube=cube,
+                filter_index=atual.filter_index.with_ages(df['IDADE']),
+                # As agregações em cache dependem da faixa etária selecionada
+                spatial_index=atual.spatial_index.with_cleared_cache(),
+                table_view=atual.table_view.with_frame(df, ['IDADE']),
+            )
+            del atual
+            gc.collect()
+            logger.info(f"Idades recalculadas para {hoje.isoformat()}: {int(alteradas.sum())} colaboradores mudaram de idade.")
+            return True
+
+    def reload(self) -> bool:
+        """Constrói a nova versão em paralelo às sessões e troca a referência atual."""
+        with self._reload_lock:
+            logger.info(f"Nova versão de {self.csv_path} detectada; recarregando em segundo plano.")
+            nova = build_dataset_version(self.csv_path, previous=self._current)
+            if nova.df.empty:
+                logger.warning("A nova versão dos dados está vazia; mantendo a versão atual até o arquivo mudar.")
+                self._rejected_stamp = nova.stamp
+                self._pending_stamp = None
+                return False
+            # Atribuição de referência é atômica: execuções em andamento terminam com a versão anterior
+            self._current = nova
+            self._pending_stamp = None
+            del nova
+            gc.collect()
+            logger.info(f"Dados recarregados: {len(self._current.df)} registros.")
+            return True
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_shared_manager() -> DatasetManager:
+    """
+    Gerenciador único do processo, compartilhado por todas as sessões. É criado (com a
+    verificação periódica iniciada) pelo pré-aquecimento ou, na falta dele, no primeiro uso.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = DatasetManager().start()
+        return _manager
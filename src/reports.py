@@ -0,0 +1,214 @@
+"""
+Geração de relatórios em lote, sem sessão do Streamlit.
+Carrega os dados processados, constrói o cubo em uma única passada e calcula, para cada
+preset de filtros, os KPIs e todas as distribuições do dashboard a partir das células do
+cubo (sem refiltrar as linhas). O resultado é gravado em Parquet, CSV e/ou HTML estático.
+
+Uso:
+    python -m src.reports --presets report_presets.yaml --output-dir relatorios --formats parquet csv html
+    python -m src.reports --split-by ESTADO --formats csv --reference-date 2025-12-31
+"""
+import argparse
+import html
+import itertools
+import logging
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from src.cube import CUBE_DIMENSIONS, EmployeeCube, build_cube
+from src.processing import load_and_process_data, load_cached_data, refresh_ages
+from src.reload import DATA_PATH
+
+logger = logging.getLogger(__name__)
+
+# Distribuições do dashboard: dimensão, título e tipo de gráfico usado no HTML
+REPORT_CHARTS = [
+    ('REGIAO', "Distribuição por Região", 'bar'),
+    ('ESTADO', "Distribuição por Estado", 'bar'),
+    ('REGIAO_CIDADE', "Distribuição por Localização", 'bar'),
+    ('IDADE', "Faixa Etária dos Colaboradores", 'histogram'),
+    ('SEXO', "Distribuição de Gênero", 'pie'),
+    ('Status', "Status dos Colaboradores", 'pie'),
+    ('PLANO', "Colaboradores por Plano", 'pie'),
+]
+
+FORMATS = ['parquet', 'csv', 'html']
+
+
+@dataclass
+class ReportPreset:
+    """Conjunto de filtros de um relatório; dimensões ausentes incluem todos os valores."""
+    name: str
+    filters: dict[str, list] = field(default_factory=dict)
+    age_range: tuple[int, int] | None = None
+
+
+def load_presets(path: Path) -> list[ReportPreset]:
+    """Lê os presets de um arquivo YAML com a lista `presets` (name, filters, age_range)."""
+    with open(path, encoding='utf-8') as arquivo:
+        config = yaml.safe_load(arquivo) or {}
+    presets = []
+    for item in config.get('presets') or []:
+        # Uma chave `filters:` vazia no YAML vira None
+        filtros = item.get('filters') or {}
+        desconhecidas = set(filtros) - set(CUBE_DIMENSIONS)
+        if desconhecidas:
+            raise ValueError(f"Preset '{item['name']}': filtros desconhecidos {sorted(desconhecidas)}.")
+        faixa = item.get('age_range')
+        presets.append(ReportPreset(item['name'], dict(filtros), tuple(faixa) if faixa else None))
+    return presets
+
+
+def split_presets(presets: list[ReportPreset], cube: EmployeeCube, dimension: str) -> list[ReportPreset]:
+    """Desdobra cada preset em um preset por valor da dimensão (por exemplo, um por estado)."""
+    return [
+        ReportPreset(f"{preset.name} - {valor}", {**preset.filters, dimension: [valor]}, preset.age_range)
+        for preset, valor in itertools.product(presets, cube.options(dimension))
+        if valor in preset.filters.get(dimension, [valor])
+    ]
+
+
+def compute_reports(cube: EmployeeCube, presets: list[ReportPreset]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Calcula KPIs e distribuições de todos os presets sobre as células do cubo.
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: KPIs (preset, total, idade média) e distribuições
+        em formato longo (preset, dimensão, valor, quantidade).
+    """
+    kpis, distribuicoes = [], []
+    for preset in presets:
+        celulas = cube.mask(preset.filters, preset.age_range)
+        total = cube.total(celulas)
+        kpis.append({
+            'preset': preset.name,
+            'total_colaboradores': total,
+            'idade_media': round(cube.mean_age(celulas), 1) if total > 0 else None,
+        })
+        for dimension, _, _ in REPORT_CHARTS:
+            dist = cube.distribution(dimension, celulas)
+            distribuicoes.append(pd.DataFrame({
+                'preset': preset.name,
+                'dimensao': dimension,
+                'valor': dist[dimension].astype(str).to_numpy(),
+                'Quantidade': dist['Quantidade'].to_numpy(),
+            }))
+    colunas = ['preset', 'dimensao', 'valor', 'Quantidade']
+    distribuicoes = pd.concat(distribuicoes, ignore_index=True) if distribuicoes else pd.DataFrame(columns=colunas)
+    return pd.DataFrame(kpis), distribuicoes
+
+
+def _slug(nome: str) -> str:
+    return re.sub(r'[^0-9A-Za-z]+', '_', nome).strip('_').lower() or 'preset'
+
+
+def _unique_slug(nome: str, usados: set[str]) -> str:
+    """Slug do nome, com um sufixo numérico quando outro preset já gerou o mesmo."""
+    base = slug = _slug(nome)
+    sufixo = 2
+    while slug in usados:
+        slug = f"{base}_{sufixo}"
+        sufixo += 1
+    usados.add(slug)
+    return slug
+
+
+def _write_html(output_dir: Path, kpis: pd.DataFrame, distribuicoes: pd.DataFrame) -> None:
+    """Uma página estática por preset, com os KPIs e os mesmos gráficos do dashboard."""
+    import plotly.express as px
+    from plotly.offline import get_plotlyjs
+
+    # Os gráficos referenciam o plotly.js do diretório (`include_plotlyjs='directory'`), gravado uma única vez
+    (output_dir / "plotly.min.js").write_text(get_plotlyjs(), encoding='utf-8')
+
+    paginas, usados = [], set()
+    for kpi in kpis.itertuples(index=False):
+        dados = distribuicoes[distribuicoes['preset'] == kpi.preset]
+        nome = html.escape(kpi.preset)
+        partes = [
+            f"<h1>{nome}</h1>",
+            f"<p>Total de colaboradores: <b>{kpi.total_colaboradores:,}</b> &middot; "
+            f"Idade média: <b>{'-' if pd.isna(kpi.idade_media) else f'{kpi.idade_media:.0f} anos'}</b></p>",
+        ]
+        for dimension, titulo, tipo in REPORT_CHARTS:
+            dist = dados[dados['dimensao'] == dimension].rename(columns={'valor': dimension})
+            if dist.empty:
+                partes.append(f"<h2>{titulo}</h2><p>Nenhum dado para exibir.</p>")
+                continue
+            if tipo == 'bar':
+                fig = px.bar(dist, x=dimension, y='Quantidade', title=titulo)
+            elif tipo == 'histogram':
+                dist = dist.assign(**{dimension: pd.to_numeric(dist[dimension])})
+                fig = px.histogram(dist, x=dimension, y='Quantidade', histfunc='sum', nbins=20, title=titulo)
+            else:
+                fig = px.pie(dist, names=dimension, values='Quantidade', hole=0.5, title=titulo)
+                fig.update_traces(textinfo='percent+label')
+            partes.append(fig.to_html(full_html=False, include_plotlyjs='directory'))
+        arquivo = output_dir / f"{_unique_slug(kpi.preset, usados)}.html"
+        arquivo.write_text(
+            f"<html><head><meta charset='utf-8'><title>{nome}</title></head><body>{''.join(partes)}</body></html>",
+            encoding='utf-8',
+        )
+        paginas.append(f"<li><a href='{arquivo.name}'>{nome}</a></li>")
+    (output_dir / "index.html").write_text(
+        f"<html><head><meta charset='utf-8'><title>Relatórios</title></head><body><ul>{''.join(paginas)}</ul></body></html>",
+        encoding='utf-8',
+    )
+
+
+def write_reports(output_dir: Path, kpis: pd.DataFrame, distribuicoes: pd.DataFrame, formats: list[str]) -> None:
+    """Grava os resultados de todos os presets nos formatos solicitados."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if 'parquet' in formats:
+        kpis.to_parquet(output_dir / "kpis.parquet", index=False)
+        distribuicoes.to_parquet(output_dir / "distribuicoes.parquet", index=False)
+    if 'csv' in formats:
+        # Mesmo formato da exportação do dashboard (separador ';' e BOM para o Excel)
+        kpis.to_csv(output_dir / "kpis.csv", sep=';', index=False, encoding='utf-8-sig')
+        distribuicoes.to_csv(output_dir / "distribuicoes.csv", sep=';', index=False, encoding='utf-8-sig')
+    if 'html' in formats:
+        _write_html(output_dir, kpis, distribuicoes)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_PATH, help="CSV de dados (padrão: DADOSREGIAO_DATA_PATH).")
+    parser.add_argument('--presets', type=Path, help="Arquivo YAML com os presets (padrão: todos os colaboradores).")
+    parser.add_argument('--split-by', choices=[d for d in CUBE_DIMENSIONS if d != 'IDADE'],
+                        help="Gera um relatório por valor da dimensão para cada preset.")
+    parser.add_argument('--output-dir', type=Path, default=Path('relatorios'))
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=['parquet', 'csv'])
+    parser.add_argument('--reference-date', type=date.fromisoformat,
+                        help="Data (AAAA-MM-DD) em que as idades são calculadas (padrão: hoje).")
+    parser.add_argument('--no-cache', action='store_true', help="Reprocessa o CSV em vez de usar o cache em disco.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    inicio = time.perf_counter()
+    df = load_and_process_data(args.data) if args.no_cache else load_cached_data(args.data)
+    if df.empty:
+        logger.error(f"Nenhum dado carregado de {args.data}.")
+        return 1
+    if args.reference_date:
+        df = refresh_ages(df, args.reference_date)
+    cube = build_cube(df)
+    del df
+
+    presets = load_presets(args.presets) if args.presets else [ReportPreset("Todos os colaboradores")]
+    if args.split_by:
+        presets = split_presets(presets, cube, args.split_by)
+    kpis, distribuicoes = compute_reports(cube, presets)
+    write_reports(args.output_dir, kpis, distribuicoes, args.formats)
+    logger.info(f"{len(presets)} relatórios gravados em {args.output_dir} ({', '.join(args.formats)}) "
+                f"em {time.perf_counter() - inicio:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
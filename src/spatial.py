@@ -0,0 +1,104 @@
+import copy
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Níveis de detalhe do mapa: zoom inicial do Mapbox e lado da célula da grade (em graus)
+MAP_LEVELS = {
+    'Brasil': {'zoom': 3, 'cell_size': 0.25},
+    'Estado': {'zoom': 6, 'cell_size': 0.05},
+    'Cidade': {'zoom': 9, 'cell_size': 0.01},
+}
+
+# Quantidade de agregações (estado de filtro + nível) guardadas em cache
+AGGREGATION_CACHE_SIZE = 32
+
+
+class SpatialGridIndex:
+    """
+    Agregação espacial para o mapa de densidade.
+    Para cada nível de detalhe, cada linha recebe previamente o código da célula da grade
+    onde cai; a agregação de uma seleção é uma contagem (bincount) por célula, de modo que
+    o gráfico recebe no máximo uma linha por célula ocupada, independentemente do total
+    de colaboradores.
+    """
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, levels: dict = MAP_LEVELS):
+        latitudes = np.asarray(latitudes, dtype='float64')
+        longitudes = np.asarray(longitudes, dtype='float64')
+        validas = ~(np.isnan(latitudes) | np.isnan(longitudes))
+
+        self.levels = levels
+        self._codes = {}
+        self._centers = {}
+        for level, params in levels.items():
+            tamanho = params['cell_size']
+            linhas = np.floor((latitudes[validas] + 90) / tamanho).astype('int64')
+            colunas = np.floor((longitudes[validas] + 180) / tamanho).astype('int64')
+            n_colunas = int(np.ceil(360 / tamanho)) + 1
+            codigos_validos, celulas = pd.factorize(linhas * n_colunas + colunas)
+
+            codigos = np.full(len(latitudes), -1, dtype='int32')
+            codigos[validas] = codigos_validos
+            self._codes[level] = codigos
+            self._centers[level] = (
+                (celulas // n_colunas + 0.5) * tamanho - 90,
+                (celulas % n_colunas + 0.5) * tamanho - 180,
+            )
+            logger.info(f"Grade do mapa '{level}': {len(celulas)} células ocupadas.")
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SpatialGridIndex":
+        return cls(df['latitude'].to_numpy(dtype='float64'), df['longitude'].to_numpy(dtype='float64'))
+
+    def with_cleared_cache(self) -> "SpatialGridIndex":
+        """
+        Mesma grade (códigos e centros das células compartilhados) com o cache de agregações
+        vazio, para quando as linhas selecionadas por um mesmo estado de filtros mudam.
+        """
+        index = copy.copy(self)
+        index._cache = OrderedDict()
+        index._lock = threading.Lock()
+        return index
+
+    def aggregate(self, mask: np.ndarray, level: str, cache_key=None) -> pd.DataFrame:
+        """
+        Conta as linhas selecionadas por célula do nível informado.
+        Args:
+            mask (np.ndarray): Máscara booleana por linha (por exemplo, de `BitmapFilterIndex.resolve`).
+            level (str): Nível de detalhe, uma das chaves de `MAP_LEVELS`.
+            cache_key: Identificador hashable do estado dos filtros; quando informado, o resultado é reaproveitado.
+        Returns:
+            pd.DataFrame: Colunas `latitude`, `longitude` (centro da célula) e `Quantidade`.
+        """
+        if cache_key is not None:
+            with self._lock:
+                if (cache_key, level) in self._cache:
+                    self._cache.move_to_end((cache_key, level))
+                    return self._cache[(cache_key, level)]
+
+        codigos = self._codes[level][mask]
+        codigos = codigos[codigos >= 0]
+        latitudes, longitudes = self._centers[level]
+        contagens = np.bincount(codigos, minlength=len(latitudes))
+        ocupadas = contagens > 0
+        celulas = pd.DataFrame({
+            'latitude': latitudes[ocupadas],
+            'longitude': longitudes[ocupadas],
+            'Quantidade': contagens[ocupadas],
+        })
+
+        if cache_key is not None:
+            with self._lock:
+                self._cache[(cache_key, level)] = celulas
+                if len(self._cache) > AGGREGATION_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return celulas
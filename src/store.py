@@ -0,0 +1,109 @@
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Incrementar sempre que o layout das colunas gravadas mudar
+SNAPSHOT_FORMAT = "2"
+
+
+def _shareable_column(series: pd.Series) -> pa.Array:
+    """
+    Converte uma coluna para um layout que o leitor consegue usar sem cópia:
+    floats mantêm NaN como valor (e não como nulo), datas são gravadas com o sentinela NaT
+    do NumPy e textos usam offsets de 64 bits (`large_string`), o formato do pandas.
+    """
+    valores = series.array
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind == 'f':
+        return pa.array(series.to_numpy(), from_pandas=False)
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind == 'M':
+        unidade, _ = np.datetime_data(series.dtype)
+        return pa.array(series.to_numpy().view('int64')).view(pa.timestamp(unidade))
+
+    array = pa.array(valores, from_pandas=True)
+    if pa.types.is_string(array.type):
+        return array.cast(pa.large_string())
+    if pa.types.is_dictionary(array.type) and pa.types.is_string(array.type.value_type):
+        return array.cast(pa.dictionary(array.type.index_type, pa.large_string(), array.type.ordered))
+    return array
+
+
+def write_table(df: pd.DataFrame, path: Path, metadata: dict[str, str]) -> None:
+    """Publica o DataFrame em Arrow IPC não comprimido, de forma atômica, com os metadados informados."""
+    tabela = pa.table([_shareable_column(df[column]) for column in df.columns], names=list(df.columns))
+    # Um único lote por arquivo: cada coluna vira um buffer contínuo, que o leitor usa sem concatenar
+    tabela = tabela.combine_chunks()
+    tabela = tabela.replace_schema_metadata({
+        **{chave.encode(): valor.encode() for chave, valor in metadata.items()},
+        b'snapshot_format': SNAPSHOT_FORMAT.encode(),
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Grava em arquivo temporário e renomeia para que leitores nunca vejam um arquivo parcial
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    feather.write_feather(tabela, tmp_path, compression='uncompressed', chunksize=max(len(df), 1))
+    os.replace(tmp_path, path)
+
+
+def _column_to_pandas(column: pa.ChunkedArray) -> pd.Series:
+    """Coluna numérica ou de data sem nulos vira uma visão somente leitura do arquivo mapeado."""
+    tipo = column.type
+    if (column.num_chunks == 1 and column.null_count == 0
+            and (pa.types.is_integer(tipo) or pa.types.is_floating(tipo) or pa.types.is_timestamp(tipo))
+            and not (pa.types.is_timestamp(tipo) and tipo.tz is not None)):
+        return pd.Series(column.chunk(0).to_numpy(zero_copy_only=True), copy=False)
+    return column.to_pandas(split_blocks=True)
+
+
+def read_frame(path: Path) -> tuple[pd.DataFrame, dict[str, str]]:
+    """
+    Lê um arquivo gravado por `write_table` mapeando-o em memória.
+    Textos, categorias e colunas numéricas apontam para as páginas do arquivo, que ficam no
+    cache de páginas do sistema e são compartilhadas por todos os processos (e réplicas no
+    mesmo nó) que leem o mesmo arquivo; somente o que precisa de conversão ocupa memória privada.
+    Returns:
+        tuple[pd.DataFrame, dict[str, str]]: O DataFrame e os metadados gravados.
+    """
+    with pa.memory_map(str(path)) as fonte:
+        tabela = pa.ipc.open_file(fonte).read_all()
+    metadata = {chave.decode(): valor.decode() for chave, valor in (tabela.schema.metadata or {}).items()}
+    if metadata.get('snapshot_format') != SNAPSHOT_FORMAT:
+        raise ValueError(f"Arquivo no formato '{metadata.get('snapshot_format')}' (atual '{SNAPSHOT_FORMAT}').")
+    df = pd.DataFrame({name: _column_to_pandas(tabela.column(name)) for name in tabela.column_names}, copy=False)
+    return df, metadata
+
+
+@contextmanager
+def publication_lock(path: Path):
+    """
+    Trava exclusiva (entre processos e contêineres no mesmo nó) para publicar `path`.
+    Quem obtém a trava deve verificar de novo se o arquivo já existe: outro processo pode
+    tê-lo publicado enquanto esta espera.
+    """
+    if fcntl is None:
+        yield
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trava = open(path.with_suffix('.lock'), 'a')
+    except OSError as e:
+        logger.warning(f"Não foi possível criar a trava de publicação de {path}: {e}")
+        yield
+        return
+    with trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(trava, fcntl.LOCK_UN)
@@ -0,0 +1,108 @@
+import logging
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Colunas que não são exibidas nem exportadas na tabela detalhada
+TABLE_HIDDEN_COLUMNS = ['DT_NASCIMENTO', 'CEP', 'latitude', 'longitude', 'HASH_ORIGEM']
+
+# Colunas consultadas pela busca textual
+SEARCH_COLUMNS = ['CHAPA', 'UNIDADE', 'FUNÇÃO', 'BAIRRO', 'CIDADE', 'REGIAO_CIDADE']
+
+PAGE_SIZES = [25, 50, 100, 250]
+CSV_CHUNK_ROWS = 50_000
+
+
+class PaginatedTable:
+    """
+    Visão paginada da tabela "Dados Detalhados".
+    Ordenação e busca são resolvidas sobre índices (códigos ordenados por coluna e valores
+    distintos normalizados), produzindo apenas posições de linhas; somente a página visível
+    é materializada, com as colunas projetadas.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self.columns = [column for column in df.columns if column not in TABLE_HIDDEN_COLUMNS]
+        self._column_positions = [df.columns.get_loc(column) for column in self.columns]
+        self._ranks = {}
+        self._sort_orders = {}
+        self._search = {}
+
+    def with_frame(self, df: pd.DataFrame, changed: list[str]) -> "PaginatedTable":
+        """
+        Visão sobre um DataFrame com as mesmas linhas em que só as colunas `changed` mudaram;
+        os índices de ordenação e busca das demais colunas são reaproveitados.
+        """
+        view = PaginatedTable(df)
+        view._ranks = {column: rank for column, rank in dict(self._ranks).items() if column not in changed}
+        view._sort_orders = {key: ordem for key, ordem in dict(self._sort_orders).items() if key[0] not in changed}
+        view._search = {column: busca for column, busca in dict(self._search).items() if column not in changed}
+        return view
+
+    def _rank(self, column: str) -> tuple[np.ndarray, int]:
+        """Código ordenado de cada linha na coluna (nulos recebem o maior código)."""
+        if column not in self._ranks:
+            codigos, valores = pd.factorize(self._df[column], sort=True)
+            self._ranks[column] = (np.where(codigos < 0, len(valores), codigos), len(valores))
+        return self._ranks[column]
+
+    def _sort_order(self, column: str, ascending: bool) -> np.ndarray:
+        """Permutação das linhas ordenadas pela coluna, com nulos sempre ao final."""
+        key = (column, ascending)
+        if key not in self._sort_orders:
+            ranks, n_valores = self._rank(column)
+            if not ascending:
+                ranks = np.where(ranks == n_valores, n_valores, n_valores - 1 - ranks)
+            self._sort_orders[key] = np.argsort(ranks, kind='stable')
+        return self._sort_orders[key]
+
+    def _search_mask(self, text: str) -> np.ndarray:
+        """Linhas em que alguma coluna de busca contém o texto (sem diferenciar maiúsculas)."""
+        text = text.strip().upper()
+        mask = np.zeros(len(self._df), dtype=bool)
+        for column in SEARCH_COLUMNS:
+            if column not in self._df.columns:
+                continue
+            if column not in self._search:
+                codigos, valores = pd.factorize(self._df[column])
+                valores = pd.Series(np.asarray(valores, dtype=object), dtype=object).astype(str).str.upper()
+                self._search[column] = (codigos, valores)
+            codigos, valores = self._search[column]
+            # A comparação de texto roda uma vez por valor distinto
+            encontrados = np.append(valores.str.contains(text, regex=False).to_numpy(dtype=bool), False)
+            mask |= encontrados[codigos]
+        return mask
+
+    def select(self, mask: np.ndarray, sort_by: str | None = None, ascending: bool = True,
+               search: str | None = None) -> np.ndarray:
+        """
+        Posições das linhas selecionadas, na ordem de exibição.
+        Args:
+            mask (np.ndarray): Máscara booleana dos filtros da barra lateral.
+            sort_by (str | None): Coluna de ordenação; None mantém a ordem original.
+            ascending (bool): Ordem crescente ou decrescente.
+            search (str | None): Texto a ser buscado nas colunas de `SEARCH_COLUMNS`.
+        """
+        if search:
+            mask = mask & self._search_mask(search)
+        if sort_by is None:
+            return np.flatnonzero(mask)
+        order = self._sort_order(sort_by, ascending)
+        return order[mask[order]]
+
+    def page(self, positions: np.ndarray, page: int, page_size: int) -> pd.DataFrame:
+        """Materializa apenas as linhas e colunas da página solicitada (numerada a partir de 1)."""
+        inicio = (page - 1) * page_size
+        return self._df.iloc[positions[inicio:inicio + page_size], self._column_positions]
+
+    def iter_csv_chunks(self, positions: np.ndarray, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[bytes]:
+        """Gera o CSV completo da seleção em blocos, sem materializar todas as linhas de uma vez."""
+        if len(positions) == 0:
+            yield self._df.iloc[:0, self._column_positions].to_csv(sep=';', index=False).encode('utf-8-sig')
+        for inicio in range(0, len(positions), chunk_rows):
+            bloco = self._df.iloc[positions[inicio:inicio + chunk_rows], self._column_positions]
+            yield bloco.to_csv(sep=';', index=False, header=(inicio == 0)).encode('utf-8-sig' if inicio == 0 else 'utf-8')
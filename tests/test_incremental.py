@@ -0,0 +1,215 @@
+import functools
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generator import generate_employees, write_dataset
+from src import constants, processing, reload
+from src.cube import build_cube
+from src.filters import BitmapFilterIndex
+from src.processing import load_and_process_data, load_cached_dataset, refresh_ages, update_processed_data
+from src.spatial import SpatialGridIndex
+from src.table import PaginatedTable
+
+
+def _write_new_export(original, path):
+    """Nova exportação: remove, altera e insere colaboradores em relação à original."""
+    raw = pd.read_csv(original, sep=';', encoding='utf-8-sig', dtype=str, keep_default_na=False)
+    raw = raw.drop(index=raw.index[::17])
+    alteradas = raw.index[::11]
+    raw.loc[alteradas, 'PLANO'] = 'Plano Z'
+    raw.loc[alteradas[::2], 'DT_NASCIMENTO'] = '29/02/1988'
+    raw.loc[alteradas[1::2], 'CIDADE'] = 'Mesquita'
+    novos = generate_employees(150, seed=99, start_id=len(raw) + 10_000)
+    pd.concat([raw, novos], ignore_index=True).to_csv(path, sep=';', index=False, encoding='utf-8-sig')
+
+
+def _cube_cells(cube):
+    """Forma canônica do cubo: valores das dimensões, contagem e soma de idades por célula não vazia."""
+    celulas = pd.DataFrame({
+        dimension: cube.categories[dimension].to_numpy(dtype=object)[cube.codes[dimension]]
+        for dimension in cube.dimensions
+    })
+    celulas['QUANTIDADE'] = cube.counts
+    celulas['SOMA_IDADE'] = cube.age_sums
+    celulas = celulas.groupby(cube.dimensions, dropna=False).sum().reset_index()
+    celulas = celulas[celulas['QUANTIDADE'] > 0]
+    return celulas.sort_values(cube.dimensions).reset_index(drop=True)
+
+
+@pytest.fixture(scope='module')
+def exports(tmp_path_factory):
+    pasta = tmp_path_factory.mktemp('exports')
+    original = write_dataset(pasta / 'v1.csv', 2_000, seed=7)
+    novo = pasta / 'v2.csv'
+    _write_new_export(original, novo)
+    return original, novo
+
+
+def test_incremental_update_matches_full_reprocess(exports):
+    original, novo = exports
+    anterior = load_and_process_data(str(original), workers=1)
+    atualizado, delta = update_processed_data(str(novo), anterior)
+    completo = load_and_process_data(str(novo), workers=1)
+
+    assert delta.inserted == 150 and delta.changed > 0 and delta.removed > 0
+    pd.testing.assert_frame_equal(atualizado, completo, check_categorical=False)
+
+
+def test_removal_only_update_matches_full_reprocess(exports, tmp_path):
+    original, _ = exports
+    novo = tmp_path / 'v3.csv'
+    raw = pd.read_csv(original, sep=';', encoding='utf-8-sig', dtype=str, keep_default_na=False)
+    raw.drop(index=raw.index[[0, 3, 500, 1200, -1]]).to_csv(novo, sep=';', index=False, encoding='utf-8-sig')
+
+    anterior = load_and_process_data(str(original), workers=1)
+    atualizado, delta = update_processed_data(str(novo), anterior)
+    completo = load_and_process_data(str(novo), workers=1)
+
+    assert (delta.inserted, delta.changed, delta.removed) == (0, 0, 5) and delta.added_rows.empty
+    pd.testing.assert_frame_equal(atualizado, completo, check_categorical=False)
+    cube = build_cube(anterior)
+    cube.apply_delta(delta.removed_rows, delta.added_rows)
+    pd.testing.assert_frame_equal(_cube_cells(cube), _cube_cells(build_cube(atualizado)))
+
+
+def test_cube_delta_matches_full_build(exports):
+    original, novo = exports
+    anterior = load_and_process_data(str(original), workers=1)
+    atualizado, delta = update_processed_data(str(novo), anterior)
+
+    cube = build_cube(anterior)
+    cube.apply_delta(delta.removed_rows, delta.added_rows)
+    completo = build_cube(atualizado)
+    pd.testing.assert_frame_equal(_cube_cells(cube), _cube_cells(completo))
+    for dimension in cube.dimensions:
+        assert cube.options(dimension) == completo.options(dimension)
+
+
+def test_cube_options_drop_values_without_rows(exports):
+    original, _ = exports
+    df = load_and_process_data(str(original), workers=1)
+    plano = df['PLANO'].dropna().iloc[0]
+    cube = build_cube(df)
+    cube.apply_delta(df[df['PLANO'] == plano], df.iloc[:0])
+    assert plano not in cube.options('PLANO')
+    assert cube.options('PLANO') == build_cube(df[df['PLANO'] != plano]).options('PLANO')
+
+
+def test_cache_does_not_reuse_rows_processed_with_other_constants(exports, tmp_path, monkeypatch):
+    original, novo = exports
+    load_cached_dataset(str(original), cache_dir=tmp_path)
+    monkeypatch.setitem(constants.OUTRAS_LOCALIDADES, 'CENTRO', 'Centro Expandido')
+
+    df, _, delta = load_cached_dataset(str(novo), cache_dir=tmp_path)
+    assert delta is None, "o snapshot anterior foi processado com outras constantes"
+    completo = load_and_process_data(str(novo), workers=1)
+    pd.testing.assert_series_equal(df['REGIAO_CIDADE'].astype(object), completo['REGIAO_CIDADE'].astype(object))
+
+def test_manager_reload_patches_cube_from_delta(exports, tmp_path, monkeypatch):
+    original, novo = exports
+    csv_path = tmp_path / 'dadosregiao.csv'
+    csv_path.write_bytes(original.read_bytes())
+    carregar = functools.partial(load_cached_dataset, cache_dir=tmp_path / 'cache')
+    monkeypatch.setattr(reload, 'load_cached_dataset', carregar)
+    chamadas = []
+    monkeypatch.setattr(reload, 'build_cube', lambda df: chamadas.append(len(df)) or build_cube(df))
+
+    manager = reload.DatasetManager(str(csv_path), poll_seconds=0)
+    anterior = manager.current
+    csv_path.write_bytes(novo.read_bytes())
+    assert manager.reload()
+
+    atual = manager.current
+    assert chamadas == [len(anterior.df)], "o cubo deveria ser atualizado pelo delta, não reconstruído"
+    assert atual.cube is not anterior.cube
+    pd.testing.assert_frame_equal(_cube_cells(atual.cube), _cube_cells(build_cube(atual.df)))
+    # A versão anterior continua íntegra para as execuções que ainda a usam
+    pd.testing.assert_frame_equal(_cube_cells(anterior.cube), _cube_cells(build_cube(anterior.df)))
+    esperado = load_and_process_data(str(novo), workers=1)
+    assert np.array_equal(np.sort(atual.df['CHAPA'].to_numpy()), np.sort(esperado['CHAPA'].to_numpy()))
+
+
+def _set_reference_date(monkeypatch, dia):
+    """Fixa a data de referência tanto no carregamento quanto no gerenciador."""
+    monkeypatch.setattr(processing, 'reference_date', lambda: dia)
+    monkeypatch.setattr(reload, 'reference_date', lambda: dia)
+
+
+def test_version_ages_match_reference_date_across_midnight(exports, tmp_path, monkeypatch):
+    original, _ = exports
+    carregar = functools.partial(load_cached_dataset, cache_dir=tmp_path / 'cache')
+    monkeypatch.setattr(reload, 'load_cached_dataset', carregar)
+    # A versão começa a ser construída em um dia e as idades são calculadas já no seguinte
+    monkeypatch.setattr(processing, 'reference_date', lambda: date(2025, 9, 1))
+    datas = iter([date(2025, 3, 1), date(2025, 9, 1)])
+    monkeypatch.setattr(reload, 'reference_date', lambda: next(datas))
+
+    versao = reload.build_dataset_version(str(original))
+    assert versao.reference_date == date(2025, 3, 1)
+    pd.testing.assert_series_equal(versao.df['IDADE'], refresh_ages(versao.df, date(2025, 3, 1))['IDADE'])
+    pd.testing.assert_frame_equal(_cube_cells(versao.cube), _cube_cells(build_cube(versao.df)))
+
+
+def test_manager_refresh_ages_matches_full_build(exports, tmp_path, monkeypatch):
+    original, _ = exports
+    carregar = functools.partial(load_cached_dataset, cache_dir=tmp_path / 'cache')
+    monkeypatch.setattr(reload, 'load_cached_dataset', carregar)
+    _set_reference_date(monkeypatch, date(2025, 3, 1))
+    manager = reload.DatasetManager(str(original), poll_seconds=0)
+    anterior = manager.current
+    pd.testing.assert_series_equal(anterior.df['IDADE'], refresh_ages(anterior.df, date(2025, 3, 1))['IDADE'])
+    # Índices da tabela já em cache antes da virada do dia
+    anterior.table_view.select(np.ones(len(anterior.df), dtype=bool), sort_by='IDADE')
+    anterior.table_view.select(np.ones(len(anterior.df), dtype=bool), sort_by='CIDADE')
+    filtros = ({'SEXO': ['F']}, (30, 30))
+    chave = (tuple(sorted(filtros[0]['SEXO'])), filtros[1])
+    anterior.spatial_index.aggregate(anterior.filter_index.resolve(*filtros), 'Estado', cache_key=chave)
+
+    _set_reference_date(monkeypatch, date(2025, 9, 1))
+    monkeypatch.setattr(reload, 'build_cube', lambda df: pytest.fail("o cubo deveria ser atualizado pelo delta"))
+    assert manager.refresh_ages()
+    atual = manager.current
+
+    esperado = refresh_ages(anterior.df, date(2025, 9, 1))
+    assert not atual.df['IDADE'].equals(anterior.df['IDADE'])
+    pd.testing.assert_series_equal(atual.df['IDADE'], esperado['IDADE'])
+    pd.testing.assert_frame_equal(_cube_cells(atual.cube), _cube_cells(build_cube(esperado)))
+
+    # O cache do mapa é por estado de filtros, que inclui a faixa etária
+    mapa = atual.spatial_index.aggregate(atual.filter_index.resolve(*filtros), 'Estado', cache_key=chave)
+    esperado_mapa = SpatialGridIndex.from_frame(esperado).aggregate(BitmapFilterIndex(esperado).resolve(*filtros), 'Estado')
+    pd.testing.assert_frame_equal(mapa, esperado_mapa)
+
+    novo_indice = BitmapFilterIndex(esperado)
+    for faixa in [(18, 30), (31, 45), (46, 80)]:
+        assert np.array_equal(atual.filter_index.resolve({'SEXO': ['F']}, faixa),
+                              novo_indice.resolve({'SEXO': ['F']}, faixa))
+    todas = np.ones(len(esperado), dtype=bool)
+    for coluna in ['IDADE', 'CIDADE']:
+        assert np.array_equal(atual.table_view.select(todas, sort_by=coluna, ascending=False),
+                              PaginatedTable(esperado).select(todas, sort_by=coluna, ascending=False))
+
+
+def test_manager_skips_empty_export_until_file_changes(exports, tmp_path, monkeypatch):
+    original, novo = exports
+    csv_path = tmp_path / 'dadosregiao.csv'
+    csv_path.write_bytes(original.read_bytes())
+    monkeypatch.setattr(reload, 'load_cached_dataset', functools.partial(load_cached_dataset, cache_dir=tmp_path / 'cache'))
+    manager = reload.DatasetManager(str(csv_path), poll_seconds=0)
+    anterior = manager.current
+
+    construir = reload.build_dataset_version
+    cargas = []
+    monkeypatch.setattr(reload, 'build_dataset_version', lambda *args, **kwargs: cargas.append(args) or construir(*args, **kwargs))
+    csv_path.write_text(original.read_text(encoding='utf-8-sig').splitlines()[0] + '\n', encoding='utf-8-sig')
+    for _ in range(5):
+        assert not manager.check_for_update()
+    assert len(cargas) == 1 and manager.current is anterior
+
+    csv_path.write_bytes(novo.read_bytes())
+    assert not manager.check_for_update()
+    assert manager.check_for_update()
+    assert len(cargas) == 2 and len(manager.current.df) > 0